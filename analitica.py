@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Reportes analíticos con agregaciones composite paginadas.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Recorre todas las combinaciones de categoría, marca y/o fecha de lanzamiento
+(date_histogram) con una agregación 'composite' paginada por 'after_key', en
+lugar de subir el 'size' de una agregación terms, y calcula métricas avg,
+stats y percentiles por grupo. Los buckets se vuelcan a columnas NumPy
+(las dimensiones keyword codificadas con diccionario y las fechas como
+datetime64) en vez de diccionarios anidados, de modo que un reporte de
+cardinalidad completa usa memoria acotada en el cluster y compacta en el
+cliente, y puede pasarse a pandas sin copiar los datos numéricos.
+"""
+
+import argparse
+import csv
+import time
+
+import numpy as np
+
+from cargar_datos import INDEX_NAME, conectar_elasticsearch
+
+TAM_PAGINA = 1000
+INTERVALO = "month"
+PERCENTILES = [50, 95, 99]
+CAPACIDAD_INICIAL = 1024
+
+# Dimensión -> (campo del índice, tipo de fuente composite)
+DIMENSIONES = {
+    "categoria": ("categoria", "terms"),
+    "marca": ("marca", "terms"),
+    "fecha": ("fecha_lanzamiento", "date_histogram")
+}
+TIPOS_METRICA = ["avg", "min", "max", "sum", "value_count", "stats", "percentiles"]
+ESTADISTICAS = ["count", "min", "max", "avg", "sum"]
+
+def definir_fuentes(dimensiones, intervalo=INTERVALO):
+    """Fuentes de la agregación composite para las dimensiones pedidas"""
+    fuentes = []
+    for dimension in dimensiones:
+        if dimension not in DIMENSIONES:
+            raise ValueError(f"Dimensión desconocida: {dimension} (opciones: {', '.join(DIMENSIONES)})")
+        campo, tipo = DIMENSIONES[dimension]
+        fuente = {"field": campo, "missing_bucket": True}
+        if tipo == "date_histogram":
+            fuente["calendar_interval"] = intervalo
+        fuentes.append({dimension: {tipo: fuente}})
+    return fuentes
+
+def parsear_metricas(especificaciones):
+    """Convierte ["precio:stats", "calificacion:avg"] en pares (campo, tipo)"""
+    metricas = []
+    for especificacion in especificaciones:
+        campo, _, tipo = especificacion.partition(":")
+        tipo = tipo or "avg"
+        if tipo not in TIPOS_METRICA:
+            raise ValueError(f"Métrica desconocida: {tipo} (opciones: {', '.join(TIPOS_METRICA)})")
+        metricas.append((campo, tipo))
+    return metricas
+
+def definir_metricas(metricas, percentiles=PERCENTILES):
+    """Subagregaciones de cada bucket para las métricas (campo, tipo)"""
+    aggs = {}
+    for campo, tipo in metricas:
+        definicion = {"field": campo}
+        if tipo == "percentiles":
+            definicion["percents"] = percentiles
+        aggs[f"{campo}_{tipo}"] = {tipo: definicion}
+    return aggs
+
+def columnas_metricas(metricas, percentiles=PERCENTILES):
+    """Nombre de cada columna de salida y cómo leerla de un bucket"""
+    columnas = []
+    for campo, tipo in metricas:
+        nombre = f"{campo}_{tipo}"
+        if tipo == "stats":
+            columnas.extend((f"{campo}_{e}", nombre, e) for e in ESTADISTICAS)
+        elif tipo == "percentiles":
+            columnas.extend((f"{campo}_p{p:g}", nombre, str(float(p))) for p in percentiles)
+        else:
+            columnas.append((nombre, nombre, "value"))
+    return columnas
+
+def _valor_metrica(bucket, agregacion, clave):
+    resultado = bucket[agregacion]
+    valor = resultado["values"].get(clave) if "values" in resultado else resultado.get(clave)
+    return np.nan if valor is None else valor
+
+class _Columna:
+    """Arreglo NumPy que crece duplicando su capacidad"""
+
+    def __init__(self, dtype):
+        self.datos = np.empty(CAPACIDAD_INICIAL, dtype=dtype)
+        self.cantidad = 0
+
+    def agregar(self, valores):
+        fin = self.cantidad + len(valores)
+        if fin > len(self.datos):
+            nuevos = np.empty(max(fin, 2 * len(self.datos)), dtype=self.datos.dtype)
+            nuevos[:self.cantidad] = self.datos[:self.cantidad]
+            self.datos = nuevos
+        self.datos[self.cantidad:fin] = valores
+        self.cantidad = fin
+
+    def valores(self):
+        return self.datos[:self.cantidad]
+
+class TablaColumnar:
+    """Resultado de un reporte: una columna NumPy por dimensión y métrica
+
+    Las dimensiones keyword se guardan como códigos int32 sobre
+    ``categorias[nombre]`` (-1 = sin valor) y las fechas como datetime64[ms]
+    (NaT = sin valor).
+    """
+
+    def __init__(self, columnas, categorias):
+        self.columnas = columnas
+        self.categorias = categorias
+
+    def __len__(self):
+        return len(next(iter(self.columnas.values()))) if self.columnas else 0
+
+    def valores(self, nombre):
+        """Valores de una columna, decodificando las dimensiones keyword"""
+        columna = self.columnas[nombre]
+        if nombre not in self.categorias:
+            return columna
+        vocabulario = np.array(self.categorias[nombre] + [None], dtype=object)
+        return vocabulario[columna]
+
+    def a_pandas(self):
+        """Convierte la tabla en un DataFrame (requiere pandas)"""
+        try:
+            import pandas
+        except ImportError:
+            raise RuntimeError("La conversión a DataFrame requiere pandas: pip install pandas")
+        datos = {}
+        for nombre, columna in self.columnas.items():
+            if nombre in self.categorias:
+                datos[nombre] = pandas.Categorical.from_codes(columna, self.categorias[nombre])
+            else:
+                datos[nombre] = columna
+        return pandas.DataFrame(datos, copy=False)
+
+    def filas(self):
+        """Itera las filas como tuplas, en el orden de las columnas"""
+        columnas = [self.valores(nombre) for nombre in self.columnas]
+        for i in range(len(self)):
+            yield tuple(columna[i] for columna in columnas)
+
+class _Acumulador:
+    """Vuelca los buckets de cada página a columnas NumPy"""
+
+    def __init__(self, dimensiones, columnas_metrica):
+        self.dimensiones = dimensiones
+        self.columnas_metrica = columnas_metrica
+        self.categorias = {d: [] for d in dimensiones if DIMENSIONES[d][1] == "terms"}
+        self._codigos = {d: {} for d in self.categorias}
+        self.columnas = {}
+        for dimension in dimensiones:
+            self.columnas[dimension] = _Columna(np.int32 if dimension in self.categorias else np.int64)
+        self.columnas["doc_count"] = _Columna(np.int64)
+        for nombre, _, _ in columnas_metrica:
+            self.columnas[nombre] = _Columna(np.float64)
+
+    def _codigo(self, dimension, valor):
+        if valor is None:
+            return -1
+        codigos = self._codigos[dimension]
+        if valor not in codigos:
+            codigos[valor] = len(self.categorias[dimension])
+            self.categorias[dimension].append(valor)
+        return codigos[valor]
+
+    def agregar(self, buckets):
+        """Agrega una página de buckets y devuelve sus columnas"""
+        pagina = {}
+        for dimension in self.dimensiones:
+            claves = [bucket["key"][dimension] for bucket in buckets]
+            if dimension in self.categorias:
+                pagina[dimension] = np.array([self._codigo(dimension, c) for c in claves], dtype=np.int32)
+            else:
+                # Epoch en ms; las fechas ausentes quedan como NaT
+                pagina[dimension] = np.array([np.iinfo(np.int64).min if c is None else c for c in claves],
+                                             dtype=np.int64)
+        pagina["doc_count"] = np.array([bucket["doc_count"] for bucket in buckets], dtype=np.int64)
+        for nombre, agregacion, clave in self.columnas_metrica:
+            pagina[nombre] = np.array([_valor_metrica(b, agregacion, clave) for b in buckets], dtype=np.float64)
+
+        for nombre, valores in pagina.items():
+            self.columnas[nombre].agregar(valores)
+        return pagina
+
+    def tabla(self):
+        columnas = {}
+        for nombre, columna in self.columnas.items():
+            valores = columna.valores()
+            if nombre in self.dimensiones and nombre not in self.categorias:
+                valores = valores.view("datetime64[ms]")
+            columnas[nombre] = valores
+        return TablaColumnar(columnas, self.categorias)
+
+def consulta_composite(dimensiones, metricas, consulta=None, tam_pagina=TAM_PAGINA,
+                       intervalo=INTERVALO, percentiles=PERCENTILES, after=None):
+    """Cuerpo de una página de la agregación composite"""
+    composite = {"size": tam_pagina, "sources": definir_fuentes(dimensiones, intervalo)}
+    if after is not None:
+        composite["after"] = after
+    agregacion = {"composite": composite}
+    if metricas:
+        agregacion["aggs"] = definir_metricas(metricas, percentiles)
+    cuerpo = {"size": 0, "track_total_hits": False, "aggs": {"grupos": agregacion}}
+    if consulta is not None:
+        cuerpo["query"] = consulta
+    return cuerpo
+
+def paginas(es, dimensiones, metricas, indice=INDEX_NAME, consulta=None, tam_pagina=TAM_PAGINA,
+            intervalo=INTERVALO, percentiles=PERCENTILES):
+    """Genera las páginas de buckets de la agregación composite, siguiendo 'after_key'"""
+    after = None
+    while True:
+        cuerpo = consulta_composite(dimensiones, metricas, consulta, tam_pagina, intervalo, percentiles, after)
+        grupos = es.search(index=indice, body=cuerpo)["aggregations"]["grupos"]
+        if grupos["buckets"]:
+            yield grupos["buckets"]
+        after = grupos.get("after_key")
+        if after is None or len(grupos["buckets"]) < tam_pagina:
+            return
+
+def generar_reporte(es, dimensiones, metricas, indice=INDEX_NAME, consulta=None, tam_pagina=TAM_PAGINA,
+                    intervalo=INTERVALO, percentiles=PERCENTILES, al_recibir=None):
+    """Ejecuta el reporte completo y devuelve una TablaColumnar
+
+    ``al_recibir(pagina)``, si se indica, recibe las columnas NumPy de cada
+    página a medida que llegan (por ejemplo, para escribirlas a disco).
+    """
+    acumulador = _Acumulador(dimensiones, columnas_metricas(metricas, percentiles))
+    for buckets in paginas(es, dimensiones, metricas, indice, consulta, tam_pagina, intervalo, percentiles):
+        pagina = acumulador.agregar(buckets)
+        if al_recibir is not None:
+            al_recibir(pagina)
+    return acumulador.tabla()
+
+def guardar_csv(tabla, ruta):
+    """Escribe la tabla en un archivo CSV"""
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(list(tabla.columnas))
+        for fila in tabla.filas():
+            escritor.writerow(["" if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in fila])
+
+def mostrar_tabla(tabla, limite=20):
+    """Muestra las primeras filas de la tabla"""
+    nombres = list(tabla.columnas)
+    print("   " + " | ".join(nombres))
+    for i, fila in enumerate(tabla.filas()):
+        if i >= limite:
+            print(f"   ... ({len(tabla) - limite} filas más)")
+            break
+        print("   " + " | ".join(f"{v:.2f}" if isinstance(v, float) else str(v) for v in fila))
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Reportes por grupo con agregaciones composite paginadas")
+    parser.add_argument("--por", default="categoria,marca",
+                        help=f"Dimensiones separadas por coma: {', '.join(DIMENSIONES)} (por defecto: categoria,marca)")
+    parser.add_argument("--metricas", default="precio:stats",
+                        help="Métricas campo:tipo separadas por coma, con tipo en "
+                             f"{', '.join(TIPOS_METRICA)} (por defecto: precio:stats)")
+    parser.add_argument("--intervalo", default=INTERVALO,
+                        help=f"Intervalo del histograma de fechas (por defecto: {INTERVALO})")
+    parser.add_argument("--percentiles", default=",".join(str(p) for p in PERCENTILES),
+                        help=f"Percentiles a calcular (por defecto: {','.join(str(p) for p in PERCENTILES)})")
+    parser.add_argument("--tam-pagina", type=int, default=TAM_PAGINA,
+                        help=f"Buckets por página (por defecto: {TAM_PAGINA})")
+    parser.add_argument("--indice", default=INDEX_NAME, help=f"Índice a analizar (por defecto: {INDEX_NAME})")
+    parser.add_argument("--csv", help="Guardar el reporte completo en un archivo CSV")
+    args = parser.parse_args()
+
+    try:
+        dimensiones = args.por.split(",")
+        definir_fuentes(dimensiones)
+        metricas = parsear_metricas(args.metricas.split(",")) if args.metricas else []
+        percentiles = [float(p) for p in args.percentiles.split(",")]
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return
+
+    es = conectar_elasticsearch()
+    if not es:
+        return
+
+    inicio = time.perf_counter()
+    try:
+        tabla = generar_reporte(es, dimensiones, metricas, args.indice, tam_pagina=args.tam_pagina,
+                                intervalo=args.intervalo, percentiles=percentiles)
+    except Exception as e:
+        print(f"❌ Error al generar el reporte: {e}")
+        return
+
+    print(f"\n📊 REPORTE POR {', '.join(d.upper() for d in dimensiones)}:")
+    print(f"   • Grupos: {len(tabla)} ({time.perf_counter() - inicio:.2f} s)")
+    print(f"   • Memoria de las columnas: {sum(c.nbytes for c in tabla.columnas.values())} bytes")
+    mostrar_tabla(tabla)
+
+    if args.csv:
+        guardar_csv(tabla, args.csv)
+        print(f"💾 Reporte guardado en '{args.csv}'")
+
+if __name__ == "__main__":
+    main()
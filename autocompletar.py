@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Autocompletado de nombres de productos y marcas del lado del cliente.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Las sugerencias se guardan en un arreglo ordenado de claves normalizadas
+(una por cada palabra inicial posible de cada nombre o marca). Una búsqueda
+binaria ubica el rango de claves de un prefijo y un árbol de segmentos con
+el máximo peso de cada tramo extrae los top-k de ese rango en O(k log n),
+sin importar cuántas claves coincidan; los prefijos repetidos se responden
+desde una cache LRU. El índice se actualiza de forma incremental leyendo del
+cluster solo los documentos con '_seq_no' mayor al último visto. Cuando el
+prefijo no tiene sugerencias locales se consulta el subcampo
+'search_as_you_type' del índice.
+"""
+
+import argparse
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+
+from cargar_datos import INDEX_NAME, conectar_elasticsearch
+from constructor_consultas import ConstructorConsulta
+from fuentes import leer_productos
+
+K_POR_DEFECTO = 5
+K_MAXIMO = 10
+TAM_CACHE = 4096
+LARGO_MAXIMO_CLAVE = 48
+TAM_PAGINA = 1000
+CAMPOS = ["nombre", "marca", "calificacion"]
+
+_PALABRA = re.compile(r"\w+")
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con las palabras separadas por un espacio"""
+    descompuesto = unicodedata.normalize("NFKD", str(texto).lower())
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(_PALABRA.findall(sin_acentos))
+
+def popularidad(producto):
+    """Peso base de un producto: su calificación, o 1 si no tiene"""
+    calificacion = producto.get("calificacion")
+    return float(calificacion) if calificacion is not None else 1.0
+
+def consulta_sugerencias(texto, k=K_POR_DEFECTO):
+    """Cuerpo de la búsqueda de sugerencias sobre los subcampos search_as_you_type"""
+    return (ConstructorConsulta()
+            .debe({"multi_match": {
+                "query": texto,
+                "type": "bool_prefix",
+                "fields": ["nombre.sugerencias", "nombre.sugerencias._2gram", "nombre.sugerencias._3gram",
+                           "marca.sugerencias"]
+            }})
+            .campos(["nombre", "marca"])
+            .tamano(k)
+            .contar_hasta(False)
+            .construir())
+
+class Autocompletado:
+    """Índice de sugerencias en memoria con árbol de máximos y cache de prefijos
+
+    Las marcas pesan la suma de la popularidad de sus productos, por lo que
+    una marca con varios productos aparece antes que cada uno de ellos. Las
+    selecciones registradas con ``registrar_seleccion`` suman peso.
+    """
+
+    def __init__(self, tam_cache=TAM_CACHE):
+        self.tam_cache = tam_cache
+        self._lock = threading.Lock()
+        self._productos = {}
+        self._selecciones = {}
+        self._claves = []
+        self._entradas = []
+        self._textos = []
+        self._tipos = []
+        self._pesos = []
+        self._posiciones = {}
+        self._arbol = array('i')
+        self._cache = OrderedDict()
+        self.uuid = None
+        self.ultimo_seq_no = -1
+        self.eliminaciones = None
+        self.contadores = {"locales": 0, "cache": 0, "cluster": 0}
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Crea el índice de sugerencias a partir de un archivo de productos"""
+        autocompletado = cls()
+        autocompletado.cargar(leer_productos(ruta))
+        return autocompletado
+
+    @property
+    def cantidad(self):
+        return len(self._textos)
+
+    def cargar(self, productos):
+        """Reemplaza los productos conocidos y reconstruye el índice"""
+        self._productos = {
+            str(p.get("id", i)): (p.get("nombre"), p.get("marca"), popularidad(p))
+            for i, p in enumerate(productos)
+        }
+        self._reconstruir()
+
+    def _reconstruir(self):
+        """Arma los arreglos ordenados de claves y el árbol de máximos"""
+        pesos = {}
+        for nombre, marca, peso in self._productos.values():
+            if nombre:
+                pesos[(nombre, "nombre")] = pesos.get((nombre, "nombre"), 0.0) + peso
+            if marca:
+                pesos[(marca, "marca")] = pesos.get((marca, "marca"), 0.0) + peso
+
+        textos, tipos, valores, pares = [], [], [], []
+        for i, ((texto, tipo), peso) in enumerate(sorted(pesos.items())):
+            textos.append(texto)
+            tipos.append(tipo)
+            valores.append(peso + self._selecciones.get(texto, 0.0))
+            palabras = normalizar(texto).split(" ")
+            for j in range(len(palabras)):
+                # Una clave por cada palabra en la que puede empezar el prefijo
+                pares.append((" ".join(palabras[j:])[:LARGO_MAXIMO_CLAVE], i))
+        pares.sort()
+
+        claves = [clave for clave, _ in pares]
+        entradas = [entrada for _, entrada in pares]
+        arbol = self._construir_arbol(entradas, valores)
+
+        with self._lock:
+            self._claves, self._entradas = claves, entradas
+            self._textos, self._tipos, self._pesos = textos, tipos, valores
+            self._posiciones = {texto: i for i, texto in enumerate(textos)}
+            self._arbol = arbol
+            self._cache.clear()
+
+    @staticmethod
+    def _mejor(entradas, pesos, a, b):
+        """De dos posiciones de clave, la de mayor peso (a igual peso, la primera sugerencia)"""
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        ea, eb = entradas[a], entradas[b]
+        return a if (pesos[ea], -ea) >= (pesos[eb], -eb) else b
+
+    def _construir_arbol(self, entradas, pesos):
+        """Árbol de segmentos iterativo: cada nodo guarda la posición de mayor peso de su tramo"""
+        n = len(entradas)
+        arbol = array('i', [-1]) * n + array('i', range(n))
+        for nodo in range(n - 1, 0, -1):
+            arbol[nodo] = self._mejor(entradas, pesos, arbol[2 * nodo], arbol[2 * nodo + 1])
+        return arbol
+
+    def _actualizar_arbol(self, posicion):
+        """Recalcula los máximos desde la hoja de 'posicion' hasta la raíz"""
+        nodo = (posicion + len(self._entradas)) // 2
+        while nodo >= 1:
+            self._arbol[nodo] = self._mejor(self._entradas, self._pesos,
+                                            self._arbol[2 * nodo], self._arbol[2 * nodo + 1])
+            nodo //= 2
+
+    def _maximo(self, inicio, fin):
+        """Posición de mayor peso en [inicio, fin), o -1 si el tramo está vacío"""
+        # Versión desenrollada de _mejor: es el camino caliente de cada sugerencia
+        entradas, pesos, arbol = self._entradas, self._pesos, self._arbol
+        n = len(entradas)
+        mejor = -1
+        clave_mejor = None
+        inicio += n
+        fin += n
+        while inicio < fin:
+            if inicio & 1:
+                candidato = arbol[inicio]
+                clave = (pesos[entradas[candidato]], -entradas[candidato])
+                if clave_mejor is None or clave > clave_mejor:
+                    mejor, clave_mejor = candidato, clave
+                inicio += 1
+            if fin & 1:
+                fin -= 1
+                candidato = arbol[fin]
+                clave = (pesos[entradas[candidato]], -entradas[candidato])
+                if clave_mejor is None or clave > clave_mejor:
+                    mejor, clave_mejor = candidato, clave
+            inicio >>= 1
+            fin >>= 1
+        return mejor
+
+    def _rango(self, clave):
+        """Posiciones [inicio, fin) de las claves que empiezan con el prefijo normalizado"""
+        inicio = bisect.bisect_left(self._claves, clave)
+        fin = bisect.bisect_right(self._claves, clave + "\uffff", inicio)
+        return inicio, fin
+
+    def _buscar(self, clave, k=K_MAXIMO):
+        """Top k de un prefijo normalizado (lista de entradas) en O(k log n)
+
+        Se extrae el máximo del rango y se parte en los tramos a su izquierda y
+        derecha; un heap elige el siguiente mejor tramo. Una sugerencia puede
+        tener varias claves en el rango, por eso se descartan las repetidas.
+        """
+        inicio, fin = self._rango(clave)
+        heap = []
+
+        def agregar_tramo(desde, hasta):
+            if desde < hasta:
+                posicion = self._maximo(desde, hasta)
+                entrada = self._entradas[posicion]
+                heapq.heappush(heap, (-self._pesos[entrada], entrada, posicion, desde, hasta))
+
+        agregar_tramo(inicio, fin)
+        vistas = set()
+        resultado = []
+        while heap and len(resultado) < k:
+            _, entrada, posicion, desde, hasta = heapq.heappop(heap)
+            if entrada not in vistas:
+                vistas.add(entrada)
+                resultado.append(entrada)
+            agregar_tramo(desde, posicion)
+            agregar_tramo(posicion + 1, hasta)
+        return resultado
+
+    def sugerir(self, prefijo, k=K_POR_DEFECTO, es=None, indice=INDEX_NAME):
+        """Devuelve hasta k sugerencias {'texto', 'tipo', 'peso'} para el prefijo
+
+        Con ``es`` los prefijos sin sugerencias locales se consultan en el
+        cluster sobre los subcampos search_as_you_type.
+        """
+        clave = normalizar(prefijo)[:LARGO_MAXIMO_CLAVE]
+        if not clave:
+            return []
+
+        with self._lock:
+            entradas = self._cache.get(clave)
+            if entradas is not None:
+                self._cache.move_to_end(clave)
+                self.contadores["cache"] += 1
+            else:
+                entradas = self._buscar(clave)
+                self._cache[clave] = entradas
+                if len(self._cache) > self.tam_cache:
+                    self._cache.popitem(last=False)
+                self.contadores["locales"] += 1
+            sugerencias = [
+                {"texto": self._textos[i], "tipo": self._tipos[i], "peso": self._pesos[i]}
+                for i in entradas[:k]
+            ]
+
+        if not sugerencias and es is not None:
+            sugerencias = self._sugerir_cluster(es, prefijo, k, indice)
+        return sugerencias
+
+    def _sugerir_cluster(self, es, prefijo, k, indice):
+        with self._lock:
+            self.contadores["cluster"] += 1
+        response = es.search(index=indice, body=consulta_sugerencias(prefijo, k))
+        return [
+            {"texto": hit["_source"].get("nombre"), "tipo": "nombre", "peso": hit["_score"]}
+            for hit in response["hits"]["hits"]
+        ]
+
+    def registrar_seleccion(self, texto, incremento=1.0):
+        """Suma peso a una sugerencia elegida por el usuario"""
+        with self._lock:
+            self._selecciones[texto] = self._selecciones.get(texto, 0.0) + incremento
+            posicion = self._posiciones.get(texto)
+            if posicion is None:
+                return
+            self._pesos[posicion] += incremento
+            self._cache.clear()
+            # Actualizar en el árbol las hojas de cada clave de la sugerencia
+            palabras = normalizar(texto).split(" ")
+            for j in range(len(palabras)):
+                clave = " ".join(palabras[j:])[:LARGO_MAXIMO_CLAVE]
+                inicio = bisect.bisect_left(self._claves, clave)
+                fin = bisect.bisect_right(self._claves, clave, inicio)
+                for hoja in range(inicio, fin):
+                    if self._entradas[hoja] == posicion:
+                        self._actualizar_arbol(hoja)
+
+    def refrescar(self, es, indice=INDEX_NAME, completo=False):
+        """Actualiza las sugerencias desde el índice; devuelve los documentos leídos
+
+        Solo se leen los documentos con '_seq_no' mayor al último visto, lo que
+        supone un índice de un único shard (como el de productos). Las
+        eliminaciones no aparecen en esa lectura, así que si cambia el UUID del
+        índice (recarga o cambio de alias) o su contador de eliminaciones, o si
+        la cantidad de documentos no coincide, se hace una recarga completa.
+        """
+        stats = es.indices.stats(index=indice, metric="docs,indexing")
+        datos = next(iter(stats["indices"].values()))
+        uuid = datos.get("uuid")
+        documentos = datos["primaries"]["docs"]["count"]
+        eliminaciones = datos["primaries"]["indexing"]["delete_total"]
+
+        completo = completo or uuid != self.uuid or eliminaciones != self.eliminaciones
+        productos = {} if completo else dict(self._productos)
+        desde = -1 if completo else self.ultimo_seq_no
+        ultimo = desde
+        search_after = None
+        leidos = 0
+
+        while True:
+            cuerpo = {
+                "size": TAM_PAGINA,
+                "query": {"range": {"_seq_no": {"gt": desde}}},
+                "seq_no_primary_term": True,
+                "sort": [{"_seq_no": "asc"}],
+                "_source": CAMPOS,
+                "track_total_hits": False
+            }
+            if search_after is not None:
+                cuerpo["search_after"] = search_after
+            hits = es.search(index=indice, body=cuerpo)["hits"]["hits"]
+            for hit in hits:
+                producto = hit["_source"]
+                productos[hit["_id"]] = (producto.get("nombre"), producto.get("marca"), popularidad(producto))
+                ultimo = hit["_seq_no"]
+            leidos += len(hits)
+            if len(hits) < TAM_PAGINA:
+                break
+            search_after = hits[-1]["sort"]
+
+        if not completo and len(productos) != documentos:
+            return self.refrescar(es, indice, completo=True)
+
+        self.uuid = uuid
+        self.ultimo_seq_no = ultimo
+        self.eliminaciones = eliminaciones
+        if leidos or completo:
+            self._productos = productos
+            self._reconstruir()
+        return leidos
+
+    def estadisticas(self):
+        """Devuelve tamaño del índice y origen de las respuestas"""
+        with self._lock:
+            return dict(self.contadores, sugerencias=len(self._textos), claves=len(self._claves))
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Sugerencias de autocompletado de productos y marcas")
+    parser.add_argument("prefijos", nargs="+", help="Prefijos a completar")
+    parser.add_argument("--k", type=int, default=K_POR_DEFECTO,
+                        help=f"Sugerencias por prefijo (por defecto: {K_POR_DEFECTO}, máximo: {K_MAXIMO})")
+    parser.add_argument("--archivo", help="Construir las sugerencias desde este archivo, sin cluster")
+    args = parser.parse_args()
+
+    es = None
+    inicio = time.perf_counter()
+    if args.archivo:
+        try:
+            autocompletado = Autocompletado.desde_archivo(args.archivo)
+        except FileNotFoundError:
+            print(f"❌ Error: No se encontró el archivo '{args.archivo}'")
+            return
+    else:
+        es = conectar_elasticsearch()
+        if not es:
+            return
+        autocompletado = Autocompletado()
+        try:
+            autocompletado.refrescar(es)
+        except Exception as e:
+            print(f"❌ Error al leer las sugerencias del índice: {e}")
+            return
+    print(f"📂 {autocompletado.cantidad} sugerencias indexadas en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    for prefijo in args.prefijos:
+        inicio = time.perf_counter()
+        sugerencias = autocompletado.sugerir(prefijo, min(args.k, K_MAXIMO), es)
+        microsegundos = (time.perf_counter() - inicio) * 1e6
+        print(f"\n🔤 '{prefijo}' ({microsegundos:.0f} µs)")
+        for sugerencia in sugerencias:
+            print(f"   • {sugerencia['texto']} [{sugerencia['tipo']}]")
+        if not sugerencias:
+            print("   (sin sugerencias)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las estrategias de ingesta del lado del cliente.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Genera un catálogo sintético, levanta el servidor simulado en otro proceso
+y ejecuta cada estrategia de carga en un proceso propio para medir docs/s,
+bytes/s, pico de memoria (RSS) y CPU del cliente de forma aislada.
+También puede apuntarse a un cluster real con --url.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from elasticsearch import Elasticsearch
+
+import cargar_datos
+from generar_catalogo import escribir_catalogo, generar_productos
+from servidor_simulado import PUERTO_SIMULADO
+
+ESTRATEGIAS = ["individual", "bulk", "bulk_paralelo"]
+CANTIDAD_POR_DEFECTO = 10000
+
+def _rusage():
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    return uso.ru_utime + uso.ru_stime, uso.ru_maxrss * 1024
+
+def _simulado(url, accion):
+    """Consulta el endpoint de estadísticas del servidor simulado, si existe"""
+    try:
+        with urllib.request.urlopen(f"{url}/_simulado/{accion}", data=b"" if accion == "reiniciar" else None) as r:
+            return json.loads(r.read())
+    except Exception:
+        return None
+
+def medir_estrategia(estrategia, url, archivo, workers, chunk_size):
+    """Ejecuta una estrategia de carga en este proceso y devuelve sus métricas"""
+    es = Elasticsearch(url, request_timeout=120)
+
+    # La salida de cargar_datos se descarta para no mezclarla con el resultado
+    with contextlib.redirect_stdout(io.StringIO()):
+        cargar_datos.crear_indice(es)
+        _simulado(url, "reiniciar")
+        cpu_inicio, _ = _rusage()
+        inicio = time.perf_counter()
+        if estrategia == "individual":
+            ok = cargar_datos.cargar_datos(es, archivo)
+        else:
+            ok = cargar_datos.cargar_datos(
+                es, archivo, bulk=True,
+                workers=workers if estrategia == "bulk_paralelo" else 1,
+                chunk_size=chunk_size
+            )
+    segundos = time.perf_counter() - inicio
+    cpu_fin, rss_pico = _rusage()
+
+    servidor = _simulado(url, "estadisticas") or {}
+    documentos = servidor.get("documentos") or es.count(index=cargar_datos.INDEX_NAME)["count"]
+    bytes_enviados = servidor.get("bytes_recibidos", os.path.getsize(archivo))
+    return {
+        "estrategia": estrategia,
+        "ok": bool(ok),
+        "documentos": documentos,
+        "segundos": segundos,
+        "docs_por_segundo": documentos / segundos,
+        "bytes_por_segundo": bytes_enviados / segundos,
+        "peticiones": servidor.get("peticiones"),
+        "rss_pico_mb": rss_pico / 1024 / 1024,
+        "cpu_segundos": cpu_fin - cpu_inicio,
+        "cpu_por_doc_us": (cpu_fin - cpu_inicio) / max(documentos, 1) * 1e6
+    }
+
+def _esperar_servidor(url, intentos=50):
+    for _ in range(intentos):
+        if _simulado(url, "estadisticas") is not None:
+            return True
+        time.sleep(0.1)
+    return False
+
+def mostrar_resultados(resultados):
+    """Muestra la tabla comparativa de estrategias"""
+    print(f"\n📊 RESULTADOS DEL BENCHMARK DE INGESTA:")
+    print(f"   {'Estrategia':<15}{'Docs':>10}{'Docs/s':>12}{'MB/s':>9}{'Peticiones':>12}"
+          f"{'RSS pico MB':>13}{'CPU s':>8}{'µs CPU/doc':>12}")
+    for r in resultados:
+        peticiones = r['peticiones'] if r['peticiones'] is not None else "-"
+        print(f"   {r['estrategia']:<15}{r['documentos']:>10}{r['docs_por_segundo']:>12.0f}"
+              f"{r['bytes_por_segundo'] / 1024 / 1024:>9.2f}{peticiones:>12}"
+              f"{r['rss_pico_mb']:>13.1f}{r['cpu_segundos']:>8.2f}{r['cpu_por_doc_us']:>12.1f}")
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de estrategias de ingesta")
+    parser.add_argument("--cantidad", type=int, default=CANTIDAD_POR_DEFECTO,
+                        help=f"Productos del catálogo sintético (por defecto: {CANTIDAD_POR_DEFECTO})")
+    parser.add_argument("--archivo", help="Usar este catálogo en lugar de generar uno")
+    parser.add_argument("--estrategias", default=",".join(ESTRATEGIAS),
+                        help=f"Estrategias separadas por coma (por defecto: {','.join(ESTRATEGIAS)})")
+    parser.add_argument("--workers", type=int, default=cargar_datos.BULK_WORKERS,
+                        help="Workers para la estrategia bulk_paralelo")
+    parser.add_argument("--chunk-size", type=int, default=cargar_datos.BULK_CHUNK_SIZE,
+                        help="Documentos por bloque bulk")
+    parser.add_argument("--url", help="Cluster destino (por defecto se levanta el servidor simulado)")
+    parser.add_argument("--json", dest="salida_json", help="Guardar los resultados en un archivo JSON")
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        # Proceso hijo: una sola estrategia, resultado como JSON en stdout
+        print(json.dumps(medir_estrategia(args.medir, args.url, args.archivo, args.workers, args.chunk_size)))
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = args.archivo
+        if not archivo:
+            archivo = os.path.join(directorio, "catalogo.ndjson")
+            escribir_catalogo(generar_productos(args.cantidad), archivo)
+            print(f"🧪 Catálogo sintético de {args.cantidad} productos ({os.path.getsize(archivo)} bytes)")
+
+        servidor = None
+        url = args.url
+        if not url:
+            url = f"http://127.0.0.1:{PUERTO_SIMULADO}"
+            servidor = subprocess.Popen(
+                [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "servidor_simulado.py"),
+                 "--puerto", str(PUERTO_SIMULADO)],
+                stdout=subprocess.DEVNULL
+            )
+            if not _esperar_servidor(url):
+                servidor.terminate()
+                print("❌ Error: No se pudo iniciar el servidor simulado")
+                return
+
+        resultados = []
+        try:
+            for estrategia in args.estrategias.split(","):
+                print(f"⏱️  Ejecutando estrategia '{estrategia}'...")
+                salida = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--medir", estrategia, "--url", url,
+                     "--archivo", archivo, "--workers", str(args.workers),
+                     "--chunk-size", str(args.chunk_size)],
+                    capture_output=True, text=True
+                )
+                if salida.returncode != 0:
+                    print(f"❌ Error en estrategia '{estrategia}': {salida.stderr.strip()}")
+                    continue
+                resultados.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+        finally:
+            if servidor:
+                servidor.terminate()
+                servidor.wait()
+
+    mostrar_resultados(resultados)
+    if args.salida_json:
+        with open(args.salida_json, 'w', encoding='utf-8') as archivo_json:
+            json.dump(resultados, archivo_json, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Cache de resultados de búsqueda del lado del cliente.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Las consultas repetidas (categorías, rangos de precio, agregaciones) se
+responden desde memoria. La clave es el cuerpo de la consulta normalizado y
+las entradas se invalidan solas cuando cambia la generación del índice
+(recarga, sincronización o cambio de alias).
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Configuración por defecto de la cache
+CACHE_MAX_ENTRADAS = 1024
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTL = 60
+INTERVALO_GENERACION = 5
+
+def normalizar_consulta(cuerpo, **parametros):
+    """Serializa la consulta de forma canónica (claves ordenadas, sin espacios)"""
+    return json.dumps(
+        {"body": cuerpo, "params": parametros},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str
+    )
+
+def clave_consulta(cuerpo, **parametros):
+    """Calcula la clave de cache de una consulta"""
+    canonica = normalizar_consulta(cuerpo, **parametros)
+    return hashlib.blake2b(canonica.encode('utf-8'), digest_size=16).hexdigest()
+
+class CacheConsultas:
+    """Cache LRU en memoria con TTL y límite por cantidad de entradas y por bytes
+
+    Cualquier objeto con los métodos ``obtener``, ``guardar``, ``invalidar`` y
+    ``estadisticas`` puede usarse en su lugar (por ejemplo, un backend externo).
+    """
+
+    def __init__(self, max_entradas=CACHE_MAX_ENTRADAS, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, indice, generacion, clave):
+        """Devuelve el resultado cacheado o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._entradas.get((indice, clave))
+            if entrada is None or entrada[0] != generacion or entrada[1] < time.monotonic():
+                if entrada is not None:
+                    self._eliminar((indice, clave))
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end((indice, clave))
+            self.aciertos += 1
+            return entrada[2]
+
+    def guardar(self, indice, generacion, clave, valor, tamano):
+        """Guarda un resultado, expulsando los menos usados si se superan los límites"""
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            if (indice, clave) in self._entradas:
+                self._eliminar((indice, clave))
+            self._entradas[(indice, clave)] = (generacion, time.monotonic() + self.ttl, valor, tamano)
+            self._bytes += tamano
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                self._eliminar(next(iter(self._entradas)))
+                self.expulsiones += 1
+
+    def invalidar(self, indice=None):
+        """Elimina las entradas de un índice, o todas si no se indica ninguno"""
+        with self._lock:
+            for clave in [c for c in self._entradas if indice is None or c[0] == indice]:
+                self._eliminar(clave)
+
+    def _eliminar(self, clave):
+        entrada = self._entradas.pop(clave)
+        self._bytes -= entrada[3]
+
+    def estadisticas(self):
+        """Devuelve los contadores de aciertos, fallos y ocupación de la cache"""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "ratio_aciertos": self.aciertos / total if total else 0.0,
+                "expulsiones": self.expulsiones,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes
+            }
+
+class BusquedaCacheada:
+    """Envoltorio del cliente ElasticSearch que responde ``search`` desde la cache
+
+    Se usa en lugar del cliente en las funciones de búsqueda; cualquier otro
+    método se delega al cliente original. La generación del índice (UUID,
+    contadores de escrituras y de refresh de cada índice detrás del nombre o
+    alias) se consulta como máximo una vez cada ``intervalo_generacion``
+    segundos. Los resultados se guardan serializados y cada acierto devuelve
+    una copia nueva, de modo que modificar la respuesta no altera la cache.
+    """
+
+    def __init__(self, es, cache=None, intervalo_generacion=INTERVALO_GENERACION):
+        self._es = es
+        self.cache = cache if cache is not None else CacheConsultas()
+        self.intervalo_generacion = intervalo_generacion
+        self._generaciones = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, nombre):
+        return getattr(self._es, nombre)
+
+    def generacion(self, indice):
+        """Devuelve la generación actual del índice, consultándola si está vencida"""
+        ahora = time.monotonic()
+        with self._lock:
+            conocida = self._generaciones.get(indice)
+            if conocida and conocida[1] > ahora:
+                return conocida[0]
+
+        # Los contadores de escrituras cambian al aceptar la escritura, no al
+        # hacerla visible: el total de refresh marca el cambio de la vista
+        stats = self._es.indices.stats(index=indice, metric="indexing,refresh")
+        generacion = tuple(sorted(
+            (nombre, datos.get("uuid"),
+             datos["primaries"]["indexing"]["index_total"],
+             datos["primaries"]["indexing"]["delete_total"],
+             datos["primaries"]["refresh"]["total"])
+            for nombre, datos in stats["indices"].items()
+        ))
+
+        with self._lock:
+            if conocida and conocida[0] != generacion:
+                # El índice cambió: las entradas anteriores ya no sirven
+                self.cache.invalidar(indice)
+            self._generaciones[indice] = (generacion, ahora + self.intervalo_generacion)
+        return generacion
+
+    def search(self, index, body=None, **parametros):
+        """Ejecuta la búsqueda o devuelve el resultado cacheado"""
+        generacion = self.generacion(index)
+        clave = clave_consulta(body, **parametros)
+
+        serializado = self.cache.obtener(index, generacion, clave)
+        if serializado is not None:
+            return json.loads(serializado)
+
+        response = self._es.search(index=index, body=body, **parametros)
+        resultado = response.body if hasattr(response, "body") else response
+        serializado = json.dumps(resultado, separators=(',', ':'))
+        self.cache.guardar(index, generacion, clave, serializado, len(serializado))
+        return resultado
+
+def mostrar_estadisticas_cache(cache):
+    """Muestra los contadores de la cache de consultas"""
+    stats = cache.estadisticas()
+    print(f"\n🧠 CACHE DE CONSULTAS:")
+    print(f"   • Aciertos: {stats['aciertos']}")
+    print(f"   • Fallos: {stats['fallos']}")
+    print(f"   • Ratio de aciertos: {stats['ratio_aciertos']:.1%}")
+    print(f"   • Entradas: {stats['entradas']} ({stats['bytes']} bytes)")
+    print(f"   • Expulsiones: {stats['expulsiones']}")
@@ -4,21 +4,57 @@ Script para cargar datos de productos en ElasticSearch y realizar consultas de e
 Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
 """
 
-import json
+import argparse
+import threading
 import time
 from datetime import datetime
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, helpers
 from elasticsearch.exceptions import ConnectionError, NotFoundError
+from cache_consultas import BusquedaCacheada, mostrar_estadisticas_cache
+from constructor_consultas import ConstructorConsulta, formatear_total
+from fuentes import leer_productos
+from metricas import UMBRAL_LENTO_MS, Metricas, crear_cliente_instrumentado, mostrar_resumen_metricas
+from sincronizacion import (ARCHIVO_ESTADO, HUELLA_PENDIENTE, cargar_estado,
+                            generar_acciones_delta, guardar_estado)
 
 # Configuración de ElasticSearch
 ES_HOST = "localhost"
 ES_PORT = 9200
 INDEX_NAME = "productos"
 
-def conectar_elasticsearch():
-    """Establece conexión con ElasticSearch"""
+# Configuración de la carga masiva (bulk)
+BULK_CHUNK_SIZE = 1000
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+BULK_WORKERS = 4
+BULK_MAX_RETRIES = 5
+BULK_INITIAL_BACKOFF = 2
+BULK_MAX_BACKOFF = 60
+
+# Configuración de las reconstrucciones sin downtime (índices versionados + alias)
+GENERACIONES_CONSERVADAS = 3
+PROPORCION_MINIMA_DOCS = 0.9
+SETTINGS_CARGA = {
+    "refresh_interval": "-1",
+    "number_of_replicas": 0,
+    "translog.durability": "async"
+}
+SETTINGS_PRODUCCION = {
+    "refresh_interval": "1s",
+    "number_of_replicas": 0,
+    "translog.durability": "request"
+}
+
+def conectar_elasticsearch(metricas=None):
+    """Establece conexión con ElasticSearch
+
+    Con ``metricas`` el cliente usa el transporte instrumentado y cada
+    llamada queda registrada en ese objeto.
+    """
     try:
-        es = Elasticsearch([f"http://{ES_HOST}:{ES_PORT}"])
+        if metricas is not None:
+            es = crear_cliente_instrumentado([f"http://{ES_HOST}:{ES_PORT}"], metricas)
+        else:
+            es = Elasticsearch([f"http://{ES_HOST}:{ES_PORT}"])
         
         # Verificar que ElasticSearch esté disponible
         if not es.ping():
@@ -33,8 +69,13 @@ def conectar_elasticsearch():
         print("❌ Error: ElasticSearch no está disponible. Asegúrate de que Docker esté ejecutándose.")
         return None
 
-def crear_indice(es):
-    """Crea el índice con mapping personalizado"""
+def definir_mapping(ordenar_por_precio=False):
+    """Devuelve el mapping y los settings del índice de productos
+
+    Con ``ordenar_por_precio`` los segmentos se guardan ordenados por precio
+    ('index.sort'), lo que permite terminar antes los listados ordenados por
+    precio que no necesitan el conteo exacto de resultados.
+    """
     mapping = {
         "mappings": {
             "properties": {
@@ -43,7 +84,9 @@ def crear_indice(es):
                     "type": "text",
                     "analyzer": "spanish",
                     "fields": {
-                        "keyword": {"type": "keyword"}
+                        "keyword": {"type": "keyword"},
+                        # Subcampos con shingles y edge n-grams para el autocompletado
+                        "sugerencias": {"type": "search_as_you_type"}
                     }
                 },
                 "categoria": {"type": "keyword"},
@@ -52,7 +95,12 @@ def crear_indice(es):
                     "analyzer": "spanish"
                 },
                 "precio": {"type": "float"},
-                "marca": {"type": "keyword"},
+                "marca": {
+                    "type": "keyword",
+                    "fields": {
+                        "sugerencias": {"type": "search_as_you_type"}
+                    }
+                },
                 "stock": {"type": "integer"},
                 "calificacion": {"type": "float"},
                 "fecha_lanzamiento": {"type": "date"}
@@ -64,9 +112,27 @@ def crear_indice(es):
         }
     }
     
+    if ordenar_por_precio:
+        mapping["settings"]["index"] = {
+            "sort.field": "precio",
+            "sort.order": "asc"
+        }
+    
+    return mapping
+
+def crear_indice(es, ordenar_por_precio=False):
+    """Crea el índice con mapping personalizado"""
+    mapping = definir_mapping(ordenar_por_precio)
+    
     try:
+        # Si 'productos' es un alias, eliminar las generaciones que apunta
+        if es.indices.exists_alias(name=INDEX_NAME):
+            generaciones = list(es.indices.get_alias(name=INDEX_NAME))
+            es.indices.delete(index=generaciones)
+            print(f"🗑️  Generaciones {', '.join(generaciones)} eliminadas")
+        
         # Eliminar índice si existe
-        if es.indices.exists(index=INDEX_NAME):
+        elif es.indices.exists(index=INDEX_NAME):
             es.indices.delete(index=INDEX_NAME)
             print(f"🗑️  Índice '{INDEX_NAME}' eliminado")
         
@@ -80,35 +146,359 @@ def crear_indice(es):
     
     return True
 
-def cargar_datos(es):
-    """Carga los datos desde el archivo JSON"""
+def crear_indice_versionado(es, ordenar_por_precio=False):
+    """Crea una nueva generación del índice con settings optimizados para la carga
+
+    La generación se nombra con un timestamp ('productos-AAAAMMDDhhmmss') y se
+    crea sin refresh, sin réplicas y con translog asíncrono. El alias
+    'productos' sigue apuntando a la generación anterior durante la carga.
+    """
+    indice = f"{INDEX_NAME}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    mapping = definir_mapping(ordenar_por_precio)
+    mapping["settings"].update(SETTINGS_CARGA)
+    
+    try:
+        es.indices.create(index=indice, body=mapping)
+        print(f"🎯 Generación '{indice}' creada con settings de carga")
+        return indice
+    except Exception as e:
+        print(f"❌ Error al crear la generación '{indice}': {e}")
+        return None
+
+def listar_generaciones(es):
+    """Devuelve las generaciones del índice ordenadas de la más antigua a la más nueva"""
+    indices = es.indices.get(index=f"{INDEX_NAME}-*", expand_wildcards="open")
+    return sorted(indices)
+
+def generacion_activa(es):
+    """Devuelve la generación a la que apunta el alias, o None si no existe"""
+    if not es.indices.exists_alias(name=INDEX_NAME):
+        return None
+    return next(iter(es.indices.get_alias(name=INDEX_NAME)))
+
+def verificar_generacion(es, indice):
+    """Comprueba que la nueva generación tenga los documentos esperados
+
+    La generación debe tener documentos y al menos PROPORCION_MINIMA_DOCS de los
+    documentos servidos actualmente, para no activar una carga truncada.
+    """
+    es.indices.refresh(index=indice)
+    nuevos = es.count(index=indice)['count']
+    if nuevos == 0:
+        print(f"❌ La generación '{indice}' está vacía")
+        return False
+    
+    if es.indices.exists(index=INDEX_NAME):
+        actuales = es.count(index=INDEX_NAME)['count']
+        if nuevos < actuales * PROPORCION_MINIMA_DOCS:
+            print(f"❌ La generación '{indice}' tiene {nuevos} documentos, "
+                  f"se esperaban al menos {actuales * PROPORCION_MINIMA_DOCS:.0f}")
+            return False
+    
+    print(f"✅ Generación '{indice}' verificada: {nuevos} documentos")
+    return True
+
+def finalizar_generacion(es, indice):
+    """Restaura los settings de producción y compacta la generación"""
+    es.indices.put_settings(index=indice, body=SETTINGS_PRODUCCION)
+    es.options(request_timeout=3600).indices.forcemerge(index=indice, max_num_segments=1)
+    print(f"🧹 Generación '{indice}' con settings de producción y force-merge a 1 segmento")
+
+def activar_generacion(es, indice):
+    """Mueve el alias 'productos' a la generación indicada de forma atómica"""
+    acciones = []
+    if es.indices.exists_alias(name=INDEX_NAME):
+        for anterior in es.indices.get_alias(name=INDEX_NAME):
+            acciones.append({"remove": {"index": anterior, "alias": INDEX_NAME}})
+    elif es.indices.exists(index=INDEX_NAME):
+        # Índice 'productos' creado sin alias: se reemplaza en la misma operación
+        acciones.append({"remove_index": {"index": INDEX_NAME}})
+    acciones.append({"add": {"index": indice, "alias": INDEX_NAME}})
+    
+    es.indices.update_aliases(body={"actions": acciones})
+    print(f"🔀 Alias '{INDEX_NAME}' apunta ahora a '{indice}'")
+
+def revertir_generacion(es):
+    """Vuelve a activar la generación anterior a la actual (rollback instantáneo)"""
     try:
-        with open('productos.json', 'r', encoding='utf-8') as file:
-            productos = json.load(file)
+        generaciones = listar_generaciones(es)
+        activa = generacion_activa(es)
+        if activa not in generaciones or generaciones.index(activa) == 0:
+            print("❌ No hay una generación anterior a la que volver")
+            return False
         
-        print(f"📂 Cargando {len(productos)} productos...")
+        activar_generacion(es, generaciones[generaciones.index(activa) - 1])
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error al revertir la generación: {e}")
+        return False
+
+def podar_generaciones(es, conservar=GENERACIONES_CONSERVADAS):
+    """Elimina las generaciones antiguas, conservando las más recientes y la activa"""
+    generaciones = listar_generaciones(es)
+    activa = generacion_activa(es)
+    
+    if activa in generaciones:
+        # Nunca se eliminan generaciones más nuevas que la activa (p. ej. tras un rollback)
+        generaciones = generaciones[:generaciones.index(activa) + 1]
+    
+    sobrantes = [g for g in generaciones[:-conservar] if g != activa] if conservar > 0 else []
+    if sobrantes:
+        es.indices.delete(index=sobrantes)
+        print(f"🗑️  Generaciones antiguas eliminadas: {', '.join(sobrantes)}")
+
+def reconstruir_indice(es, archivo='productos.json', bulk=True, ordenar_por_precio=False, **opciones_carga):
+    """Reconstruye el índice sin downtime usando una generación nueva y un alias
+
+    Mientras se carga la nueva generación, las búsquedas siguen respondiendo
+    desde la anterior. Solo si la carga se verifica se cambia el alias.
+    """
+    indice = crear_indice_versionado(es, ordenar_por_precio)
+    if not indice:
+        return False
+    
+    try:
+        if not (cargar_datos(es, archivo, indice=indice, bulk=bulk, **opciones_carga)
+                and verificar_generacion(es, indice)):
+            es.indices.delete(index=indice)
+            print(f"🗑️  Generación '{indice}' descartada; el alias no se modificó")
+            return False
+        
+        finalizar_generacion(es, indice)
+        activar_generacion(es, indice)
+        podar_generaciones(es)
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error al reconstruir el índice: {e}")
+        return False
+
+def cargar_datos(es, archivo='productos.json', indice=INDEX_NAME, bulk=False, workers=BULK_WORKERS,
+                 chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES):
+    """Carga los datos desde el archivo JSON, NDJSON o gzip en streaming"""
+    try:
+        # Los productos se leen de a uno: la indexación empieza de inmediato
+        productos = leer_productos(archivo)
+        
+        print(f"📂 Cargando productos desde '{archivo}'...")
+        
+        if bulk:
+            resumen = cargar_datos_bulk(
+                es, productos,
+                indice=indice,
+                workers=workers,
+                chunk_size=chunk_size,
+                max_chunk_bytes=max_chunk_bytes
+            )
+            es.indices.refresh(index=indice)
+            mostrar_resumen_bulk(resumen)
+            return resumen["indexados"] > 0 or resumen["leidos"] == 0
         
         # Indexar cada producto
+        total = 0
         for producto in productos:
             response = es.index(
-                index=INDEX_NAME,
+                index=indice,
                 id=producto['id'],
                 body=producto
             )
+            total += 1
             
         # Refrescar el índice para que los datos estén disponibles inmediatamente
-        es.indices.refresh(index=INDEX_NAME)
+        es.indices.refresh(index=indice)
         
-        print(f"✅ {len(productos)} productos cargados exitosamente")
+        print(f"✅ {total} productos cargados exitosamente")
         return True
         
     except FileNotFoundError:
-        print("❌ Error: No se encontró el archivo 'productos.json'")
+        print(f"❌ Error: No se encontró el archivo '{archivo}'")
         return False
     except Exception as e:
         print(f"❌ Error al cargar datos: {e}")
         return False
 
+class _IteradorCompartido:
+    """Iterador protegido con lock para repartir acciones entre varios workers"""
+
+    def __init__(self, iterable):
+        self._iterador = iter(iterable)
+        self._lock = threading.Lock()
+        self.consumidos = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._lock:
+            elemento = next(self._iterador)
+            self.consumidos += 1
+            return elemento
+
+def generar_acciones(productos, indice=INDEX_NAME):
+    """Convierte productos en acciones de indexación para la API _bulk"""
+    for producto in productos:
+        yield {
+            "_index": indice,
+            "_id": producto['id'],
+            "_source": producto
+        }
+
+def cargar_datos_bulk(es, productos, indice=INDEX_NAME, workers=BULK_WORKERS,
+                      chunk_size=BULK_CHUNK_SIZE, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                      max_retries=BULK_MAX_RETRIES):
+    """Carga productos con la API _bulk usando varios workers en paralelo
+
+    Devuelve un diccionario con el resumen de la carga.
+    """
+    return ejecutar_bulk(
+        es, generar_acciones(productos, indice),
+        workers=workers,
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        max_retries=max_retries
+    )
+
+def ejecutar_bulk(es, acciones, workers=BULK_WORKERS, chunk_size=BULK_CHUNK_SIZE,
+                  max_chunk_bytes=BULK_MAX_CHUNK_BYTES, max_retries=BULK_MAX_RETRIES,
+                  ignorar_status=(), registrar_fallidos=False):
+    """Envía acciones a la API _bulk usando varios workers en paralelo
+
+    Cada worker ejecuta ``helpers.streaming_bulk`` sobre un iterador compartido,
+    de modo que los bloques quedan acotados por cantidad de documentos y por
+    bytes. Los rechazos 429 se reintentan con backoff exponencial y el resto de
+    errores por documento se contabilizan sin abortar la carga. Los status en
+    ``ignorar_status`` (p. ej. 404 al eliminar) se cuentan como correctos y, con
+    ``registrar_fallidos``, el resumen incluye los ids de todas las acciones fallidas.
+    """
+    acciones = _IteradorCompartido(acciones)
+    lock = threading.Lock()
+    resumen = {"indexados": 0, "fallidos": 0, "errores": [], "excepciones": [], "ids_fallidos": []}
+
+    def worker():
+        while True:
+            try:
+                for ok, item in helpers.streaming_bulk(
+                    es,
+                    acciones,
+                    chunk_size=chunk_size,
+                    max_chunk_bytes=max_chunk_bytes,
+                    max_retries=max_retries,
+                    initial_backoff=BULK_INITIAL_BACKOFF,
+                    max_backoff=BULK_MAX_BACKOFF,
+                    raise_on_error=False,
+                    raise_on_exception=False
+                ):
+                    info = next(iter(item.values()))
+                    with lock:
+                        if ok or info.get("status") in ignorar_status:
+                            resumen["indexados"] += 1
+                        else:
+                            resumen["fallidos"] += 1
+                            if len(resumen["errores"]) < 10:
+                                resumen["errores"].append(item)
+                            if registrar_fallidos:
+                                resumen["ids_fallidos"].append(info.get("_id"))
+                return
+            except Exception as e:
+                # El bloque en curso se pierde; el worker sigue con el resto
+                with lock:
+                    resumen["excepciones"].append(str(e))
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    resumen["leidos"] = acciones.consumidos
+    resumen["perdidos"] = acciones.consumidos - resumen["indexados"] - resumen["fallidos"]
+    resumen["segundos"] = time.perf_counter() - inicio
+    return resumen
+
+def mostrar_resumen_bulk(resumen):
+    """Muestra el resumen de throughput y errores de una carga bulk"""
+    segundos = resumen["segundos"] or 1e-9
+    print(f"\n📦 RESUMEN DE CARGA BULK:")
+    print(f"   • Documentos leídos: {resumen['leidos']}")
+    print(f"   • Documentos indexados: {resumen['indexados']}")
+    print(f"   • Documentos con error: {resumen['fallidos']}")
+    if resumen["perdidos"]:
+        print(f"   • Documentos perdidos por fallos de conexión: {resumen['perdidos']}")
+    print(f"   • Tiempo total: {resumen['segundos']:.2f} s")
+    print(f"   • Throughput: {resumen['indexados'] / segundos:.0f} docs/s")
+
+    for error in resumen["errores"]:
+        accion, info = next(iter(error.items()))
+        print(f"   ⚠️  {accion} id={info.get('_id')} status={info.get('status')}: {info.get('error')}")
+    for excepcion in resumen["excepciones"][:10]:
+        print(f"   ⚠️  Excepción en worker: {excepcion}")
+
+def obtener_uuid_indice(es, indice=INDEX_NAME):
+    """Devuelve el UUID del índice (o de la generación a la que apunta el alias)"""
+    info = es.indices.get(index=indice)
+    return next(iter(info.values()))['settings']['index']['uuid']
+
+def sincronizar_datos(es, archivo='productos.json', archivo_estado=ARCHIVO_ESTADO, **opciones_bulk):
+    """Envía solo los productos nuevos, modificados o eliminados desde la última ejecución"""
+    try:
+        if not es.indices.exists(index=INDEX_NAME) and not crear_indice(es):
+            return False
+        
+        uuid = obtener_uuid_indice(es)
+        estado = cargar_estado(archivo_estado)
+        if estado.get("indice_uuid") != uuid:
+            # Sin estado válido para este índice: se parte de los ids que contiene,
+            # así todo el catálogo se reenvía y los ids sobrantes se eliminan
+            print(f"⚠️  Sin estado de sincronización para este índice, se reconstruye desde '{INDEX_NAME}'")
+            huellas = {
+                hit['_id']: HUELLA_PENDIENTE
+                for hit in helpers.scan(es, index=INDEX_NAME, _source=False, size=5000)
+            }
+            estado = {"indice_uuid": uuid, "huellas": huellas}
+        
+        print(f"🔄 Sincronizando productos desde '{archivo}'...")
+        huellas_nuevas = {}
+        contadores = {"nuevos": 0, "modificados": 0, "sin_cambios": 0, "eliminados": 0}
+        acciones = generar_acciones_delta(
+            leer_productos(archivo), estado["huellas"], huellas_nuevas, INDEX_NAME, contadores
+        )
+        resumen = ejecutar_bulk(es, acciones, ignorar_status=(404,), registrar_fallidos=True,
+                                **opciones_bulk)
+        
+        print(f"   • Nuevos: {contadores['nuevos']}")
+        print(f"   • Modificados: {contadores['modificados']}")
+        print(f"   • Sin cambios: {contadores['sin_cambios']}")
+        print(f"   • Eliminados: {contadores['eliminados']}")
+        mostrar_resumen_bulk(resumen)
+        
+        if resumen["excepciones"] or resumen["perdidos"]:
+            # No se sabe qué documentos llegaron: se conserva el estado anterior
+            print("❌ Sincronización incompleta, el estado no se actualizó")
+            return False
+        
+        # Las acciones fallidas se reintentan en la próxima ejecución
+        for id_fallido in resumen["ids_fallidos"]:
+            if id_fallido in huellas_nuevas:
+                del huellas_nuevas[id_fallido]
+            else:
+                huellas_nuevas[id_fallido] = HUELLA_PENDIENTE
+        
+        guardar_estado({"indice_uuid": uuid, "huellas": huellas_nuevas}, archivo_estado)
+        if resumen["leidos"]:
+            es.indices.refresh(index=INDEX_NAME)
+        
+        print(f"✅ Sincronización completada: {resumen['leidos']} cambios enviados")
+        return True
+        
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo '{archivo}'")
+        return False
+    except Exception as e:
+        print(f"❌ Error al sincronizar datos: {e}")
+        return False
+
 def mostrar_estadisticas(es):
     """Muestra estadísticas básicas del índice"""
     try:
@@ -117,148 +507,147 @@ def mostrar_estadisticas(es):
         
         print(f"\n📊 ESTADÍSTICAS DEL ÍNDICE '{INDEX_NAME}':")
         print(f"   • Total documentos: {count['count']}")
-        print(f"   • Tamaño del índice: {stats['indices'][INDEX_NAME]['total']['store']['size_in_bytes']} bytes")
-        print(f"   • Shards: {stats['indices'][INDEX_NAME]['total']['segments']['count']}")
+        print(f"   • Tamaño del índice: {stats['_all']['total']['store']['size_in_bytes']} bytes")
+        print(f"   • Shards: {stats['_shards']['total']}")
+        print(f"   • Segmentos: {stats['_all']['total']['segments']['count']}")
         
     except Exception as e:
         print(f"❌ Error al obtener estadísticas: {e}")
 
+def consulta_por_nombre(termino):
+    """Cuerpo de la búsqueda por nombre del producto"""
+    return (ConstructorConsulta()
+            .coincide("nombre", termino)
+            .resaltar("nombre")
+            .campos(["nombre", "precio"])
+            .construir())
+
+def mostrar_por_nombre(response, termino):
+    """Muestra los resultados de la búsqueda por nombre"""
+    print(f"\n🔍 BÚSQUEDA POR NOMBRE: '{termino}'")
+    print(f"   Resultados encontrados: {formatear_total(response['hits']['total'])}")
+    
+    for hit in response['hits']['hits']:
+        producto = hit['_source']
+        score = hit['_score']
+        print(f"   • {producto['nombre']} - ${producto['precio']} (Score: {score:.2f})")
+
 def buscar_por_nombre(es, termino):
     """Búsqueda por nombre del producto"""
-    query = {
-        "query": {
-            "match": {
-                "nombre": termino
-            }
-        },
-        "highlight": {
-            "fields": {
-                "nombre": {}
-            }
-        }
-    }
-    
     try:
-        response = es.search(index=INDEX_NAME, body=query)
-        print(f"\n🔍 BÚSQUEDA POR NOMBRE: '{termino}'")
-        print(f"   Resultados encontrados: {response['hits']['total']['value']}")
-        
-        for hit in response['hits']['hits']:
-            producto = hit['_source']
-            score = hit['_score']
-            print(f"   • {producto['nombre']} - ${producto['precio']} (Score: {score:.2f})")
+        response = es.search(index=INDEX_NAME, body=consulta_por_nombre(termino))
+        mostrar_por_nombre(response, termino)
             
     except Exception as e:
         print(f"❌ Error en búsqueda por nombre: {e}")
 
+def consulta_por_rango_precio(precio_min, precio_max):
+    """Cuerpo de la búsqueda por rango de precios"""
+    # Filtro sin puntaje + orden por precio: con 'index.sort' termina anticipadamente
+    return (ConstructorConsulta()
+            .filtro_rango("precio", gte=precio_min, lte=precio_max)
+            .ordenar("precio", "asc")
+            .campos(["nombre", "precio", "categoria"])
+            .construir())
+
+def mostrar_por_rango_precio(response, precio_min, precio_max):
+    """Muestra los resultados de la búsqueda por rango de precios"""
+    print(f"\n💰 BÚSQUEDA POR RANGO DE PRECIO: ${precio_min} - ${precio_max}")
+    print(f"   Resultados encontrados: {formatear_total(response['hits']['total'])}")
+    
+    for hit in response['hits']['hits']:
+        producto = hit['_source']
+        print(f"   • {producto['nombre']} - ${producto['precio']} ({producto['categoria']})")
+
 def buscar_por_rango_precio(es, precio_min, precio_max):
     """Búsqueda por rango de precios"""
-    query = {
-        "query": {
-            "range": {
-                "precio": {
-                    "gte": precio_min,
-                    "lte": precio_max
-                }
-            }
-        },
-        "sort": [
-            {"precio": {"order": "asc"}}
-        ]
-    }
-    
     try:
-        response = es.search(index=INDEX_NAME, body=query)
-        print(f"\n💰 BÚSQUEDA POR RANGO DE PRECIO: ${precio_min} - ${precio_max}")
-        print(f"   Resultados encontrados: {response['hits']['total']['value']}")
-        
-        for hit in response['hits']['hits']:
-            producto = hit['_source']
-            print(f"   • {producto['nombre']} - ${producto['precio']} ({producto['categoria']})")
+        response = es.search(index=INDEX_NAME, body=consulta_por_rango_precio(precio_min, precio_max))
+        mostrar_por_rango_precio(response, precio_min, precio_max)
             
     except Exception as e:
         print(f"❌ Error en búsqueda por rango de precio: {e}")
 
+def consulta_por_categoria(categoria):
+    """Cuerpo de la búsqueda por categoría"""
+    return (ConstructorConsulta()
+            .filtro_termino("categoria", categoria)
+            .campos(["nombre", "precio"])
+            .construir())
+
+def mostrar_por_categoria(response, categoria):
+    """Muestra los resultados de la búsqueda por categoría"""
+    print(f"\n📁 BÚSQUEDA POR CATEGORÍA: '{categoria}'")
+    print(f"   Resultados encontrados: {formatear_total(response['hits']['total'])}")
+    
+    for hit in response['hits']['hits']:
+        producto = hit['_source']
+        print(f"   • {producto['nombre']} - ${producto['precio']}")
+
 def buscar_por_categoria(es, categoria):
     """Búsqueda por categoría"""
-    query = {
-        "query": {
-            "term": {
-                "categoria": categoria
-            }
-        }
-    }
-    
     try:
-        response = es.search(index=INDEX_NAME, body=query)
-        print(f"\n📁 BÚSQUEDA POR CATEGORÍA: '{categoria}'")
-        print(f"   Resultados encontrados: {response['hits']['total']['value']}")
-        
-        for hit in response['hits']['hits']:
-            producto = hit['_source']
-            print(f"   • {producto['nombre']} - ${producto['precio']}")
+        response = es.search(index=INDEX_NAME, body=consulta_por_categoria(categoria))
+        mostrar_por_categoria(response, categoria)
             
     except Exception as e:
         print(f"❌ Error en búsqueda por categoría: {e}")
 
+def consulta_combinada():
+    """Cuerpo de la búsqueda combinada con múltiples filtros"""
+    return (ConstructorConsulta()
+            .filtro_rango("precio", gte=100, lte=300)
+            .filtro_rango("calificacion", gte=4.0)
+            .deberia({"match": {"descripcion": "inalámbrico"}})
+            .deberia({"term": {"categoria": "Accesorios"}})
+            .minimo_deberia(1)
+            .ordenar("calificacion", "desc")
+            .ordenar("precio", "asc")
+            .campos(["nombre", "precio", "calificacion"])
+            .construir())
+
+def mostrar_combinada(response):
+    """Muestra los resultados de la búsqueda combinada"""
+    print(f"\n🎯 BÚSQUEDA COMBINADA:")
+    print(f"   Filtros: Precio $100-$300, Calificación ≥4.0, Con 'inalámbrico' o categoría 'Accesorios'")
+    print(f"   Resultados encontrados: {formatear_total(response['hits']['total'])}")
+    
+    for hit in response['hits']['hits']:
+        producto = hit['_source']
+        print(f"   • {producto['nombre']} - ${producto['precio']} (⭐{producto['calificacion']})")
+
 def busqueda_combinada(es):
     """Búsqueda combinada con múltiples filtros"""
-    query = {
-        "query": {
-            "bool": {
-                "must": [
-                    {"range": {"precio": {"gte": 100, "lte": 300}}},
-                    {"range": {"calificacion": {"gte": 4.0}}}
-                ],
-                "should": [
-                    {"match": {"descripcion": "inalámbrico"}},
-                    {"match": {"categoria": "Accesorios"}}
-                ],
-                "minimum_should_match": 1
-            }
-        },
-        "sort": [
-            {"calificacion": {"order": "desc"}},
-            {"precio": {"order": "asc"}}
-        ]
-    }
-    
     try:
-        response = es.search(index=INDEX_NAME, body=query)
-        print(f"\n🎯 BÚSQUEDA COMBINADA:")
-        print(f"   Filtros: Precio $100-$300, Calificación ≥4.0, Con 'inalámbrico' o categoría 'Accesorios'")
-        print(f"   Resultados encontrados: {response['hits']['total']['value']}")
-        
-        for hit in response['hits']['hits']:
-            producto = hit['_source']
-            print(f"   • {producto['nombre']} - ${producto['precio']} (⭐{producto['calificacion']})")
+        response = es.search(index=INDEX_NAME, body=consulta_combinada())
+        mostrar_combinada(response)
             
     except Exception as e:
         print(f"❌ Error en búsqueda combinada: {e}")
 
-def agregaciones_ejemplo(es):
-    """Ejemplo de agregaciones para análisis de datos"""
-    query = {
-        "size": 0,  # No queremos los documentos, solo las agregaciones
-        "aggs": {
-            "productos_por_categoria": {
+def consulta_agregaciones():
+    """Cuerpo de las agregaciones de ejemplo"""
+    return (ConstructorConsulta()
+            .tamano(0)  # No queremos los documentos, solo las agregaciones
+            .contar_hasta(False)
+            .agregacion("productos_por_categoria", {
                 "terms": {
                     "field": "categoria",
                     "size": 10
                 }
-            },
-            "productos_por_marca": {
+            })
+            .agregacion("productos_por_marca", {
                 "terms": {
                     "field": "marca",
                     "size": 5
                 }
-            },
-            "estadisticas_precio": {
+            })
+            .agregacion("estadisticas_precio", {
                 "stats": {
                     "field": "precio"
                 }
-            },
-            "rango_precios": {
+            })
+            .agregacion("rango_precios", {
                 "range": {
                     "field": "precio",
                     "ranges": [
@@ -267,81 +656,173 @@ def agregaciones_ejemplo(es):
                         {"from": 300}
                     ]
                 }
-            }
-        }
-    }
+            })
+            .construir())
+
+def mostrar_agregaciones(response):
+    """Muestra el resultado de las agregaciones de ejemplo"""
+    aggs = response['aggregations']
+    
+    print(f"\n📈 ANÁLISIS Y AGREGACIONES:")
+    
+    # Productos por categoría
+    print(f"   📁 Productos por categoría:")
+    for bucket in aggs['productos_por_categoria']['buckets']:
+        print(f"      • {bucket['key']}: {bucket['doc_count']} productos")
+    
+    # Productos por marca
+    print(f"   🏷️  Top marcas:")
+    for bucket in aggs['productos_por_marca']['buckets']:
+        print(f"      • {bucket['key']}: {bucket['doc_count']} productos")
+    otras = aggs['productos_por_marca'].get('sum_other_doc_count', 0)
+    if otras:
+        print(f"      • Otras marcas: {otras} productos (reporte completo: analitica.py --por marca)")
     
+    # Estadísticas de precios
+    stats = aggs['estadisticas_precio']
+    print(f"   💰 Estadísticas de precios:")
+    print(f"      • Precio promedio: ${stats['avg']:.2f}")
+    print(f"      • Precio mínimo: ${stats['min']:.2f}")
+    print(f"      • Precio máximo: ${stats['max']:.2f}")
+    
+    # Rangos de precios
+    print(f"   📊 Distribución por rangos de precio:")
+    for bucket in aggs['rango_precios']['buckets']:
+        if 'from' in bucket and 'to' in bucket:
+            rango = f"${bucket['from']:.0f} - ${bucket['to']:.0f}"
+        elif 'to' in bucket:
+            rango = f"Menos de ${bucket['to']:.0f}"
+        else:
+            rango = f"Más de ${bucket['from']:.0f}"
+        print(f"      • {rango}: {bucket['doc_count']} productos")
+
+def agregaciones_ejemplo(es):
+    """Ejemplo de agregaciones para análisis de datos"""
     try:
-        response = es.search(index=INDEX_NAME, body=query)
-        aggs = response['aggregations']
-        
-        print(f"\n📈 ANÁLISIS Y AGREGACIONES:")
-        
-        # Productos por categoría
-        print(f"   📁 Productos por categoría:")
-        for bucket in aggs['productos_por_categoria']['buckets']:
-            print(f"      • {bucket['key']}: {bucket['doc_count']} productos")
-        
-        # Productos por marca
-        print(f"   🏷️  Top marcas:")
-        for bucket in aggs['productos_por_marca']['buckets']:
-            print(f"      • {bucket['key']}: {bucket['doc_count']} productos")
-        
-        # Estadísticas de precios
-        stats = aggs['estadisticas_precio']
-        print(f"   💰 Estadísticas de precios:")
-        print(f"      • Precio promedio: ${stats['avg']:.2f}")
-        print(f"      • Precio mínimo: ${stats['min']:.2f}")
-        print(f"      • Precio máximo: ${stats['max']:.2f}")
-        
-        # Rangos de precios
-        print(f"   📊 Distribución por rangos de precio:")
-        for bucket in aggs['rango_precios']['buckets']:
-            if 'from' in bucket and 'to' in bucket:
-                rango = f"${bucket['from']:.0f} - ${bucket['to']:.0f}"
-            elif 'to' in bucket:
-                rango = f"Menos de ${bucket['to']:.0f}"
-            else:
-                rango = f"Más de ${bucket['from']:.0f}"
-            print(f"      • {rango}: {bucket['doc_count']} productos")
+        response = es.search(index=INDEX_NAME, body=consulta_agregaciones())
+        mostrar_agregaciones(response)
             
     except Exception as e:
         print(f"❌ Error en agregaciones: {e}")
 
-def main():
-    """Función principal"""
-    print("🚀 INICIANDO SCRIPT DE ELASTICSEARCH - GRUPO 1")
+def parsear_argumentos():
+    """Define los argumentos de línea de comandos del script"""
+    parser = argparse.ArgumentParser(
+        description="Carga productos en ElasticSearch y ejecuta consultas de ejemplo"
+    )
+    parser.add_argument("--archivo", default="productos.json",
+                        help="Archivo de productos JSON, NDJSON o .gz (por defecto: productos.json)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Usar la API _bulk con varios workers en paralelo")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS,
+                        help=f"Workers bulk concurrentes (por defecto: {BULK_WORKERS})")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE,
+                        help=f"Documentos máximos por bloque bulk (por defecto: {BULK_CHUNK_SIZE})")
+    parser.add_argument("--chunk-bytes", type=int, default=BULK_MAX_CHUNK_BYTES,
+                        help=f"Bytes máximos por bloque bulk (por defecto: {BULK_MAX_CHUNK_BYTES})")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--reconstruir", action="store_true",
+                      help="Cargar en una generación nueva y cambiar el alias sin downtime")
+    modo.add_argument("--revertir", action="store_true",
+                      help="Volver el alias a la generación anterior y terminar")
+    modo.add_argument("--sincronizar", action="store_true",
+                      help="Enviar solo los productos nuevos, modificados o eliminados")
+    parser.add_argument("--estado", default=ARCHIVO_ESTADO,
+                        help=f"Archivo de estado de la sincronización (por defecto: {ARCHIVO_ESTADO})")
+    parser.add_argument("--ordenar-por-precio", action="store_true",
+                        help="Crear el índice con 'index.sort' por precio")
+    parser.add_argument("--cache", action="store_true",
+                        help="Responder las consultas repetidas desde una cache local")
+    parser.add_argument("--local", action="store_true",
+                        help="Ejecutar las consultas con el motor local en memoria, sin cluster")
+    parser.add_argument("--metricas",
+                        help="Exportar métricas por llamada a este archivo (.json o formato Prometheus)")
+    parser.add_argument("--umbral-lento-ms", type=float, default=UMBRAL_LENTO_MS,
+                        help=f"Duración a partir de la cual una llamada es lenta (por defecto: {UMBRAL_LENTO_MS})")
+    parser.add_argument("--log-lentas",
+                        help="Archivo JSONL donde registrar las llamadas lentas con su cuerpo")
+    args = parser.parse_args()
+    if args.local and (args.metricas or args.log_lentas):
+        # Las métricas miden las llamadas al cluster; el motor local no hace ninguna
+        parser.error("--metricas y --log-lentas requieren un cluster y no pueden usarse con --local")
+    return args
+
+def ejecutar_consultas(buscador):
+    """Ejecuta las consultas de ejemplo con el cliente, la cache o el motor local"""
+    print("\n" + "=" * 50)
+    print("🔍 EJECUTANDO CONSULTAS DE EJEMPLO")
     print("=" * 50)
     
-    # Conectar a ElasticSearch
-    es = conectar_elasticsearch()
-    if not es:
+    buscar_por_nombre(buscador, "Logitech")
+    buscar_por_rango_precio(buscador, 100, 300)
+    buscar_por_categoria(buscador, "Accesorios")
+    busqueda_combinada(buscador)
+    agregaciones_ejemplo(buscador)
+
+def ejecutar_local(args):
+    """Ejecuta las consultas de ejemplo con el motor local, sin cluster"""
+    try:
+        from motor_local import MotorLocal
+    except ImportError:
+        print("❌ Error: El motor local requiere numpy: pip install numpy")
         return
     
-    # Crear índice
-    if not crear_indice(es):
+    print(f"🧭 Usando el motor de búsqueda local con '{args.archivo}'")
+    try:
+        motor = MotorLocal.desde_archivo(args.archivo)
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo '{args.archivo}'")
         return
+    print(f"✅ {motor.cantidad} productos indexados en memoria")
+    
+    ejecutar_consultas(motor)
     
-    # Cargar datos
-    if not cargar_datos(es):
+    print("\n" + "=" * 50)
+    print("✅ CONSULTAS LOCALES COMPLETADAS")
+    print("=" * 50)
+
+def ejecutar(es, args):
+    """Carga los datos según el modo elegido y ejecuta las consultas de ejemplo"""
+    if args.revertir:
+        revertir_generacion(es)
         return
     
+    opciones_carga = {
+        "workers": args.workers,
+        "chunk_size": args.chunk_size,
+        "max_chunk_bytes": args.chunk_bytes
+    }
+    
+    if args.sincronizar:
+        # Sincronización incremental: solo se envían los cambios
+        if not sincronizar_datos(es, args.archivo, args.estado, **opciones_carga):
+            return
+    elif args.reconstruir:
+        # Reconstrucción sin downtime: generación nueva + cambio atómico del alias
+        if not reconstruir_indice(es, args.archivo, bulk=args.bulk,
+                                  ordenar_por_precio=args.ordenar_por_precio, **opciones_carga):
+            return
+    else:
+        # Crear índice
+        if not crear_indice(es, args.ordenar_por_precio):
+            return
+        
+        # Cargar datos
+        if not cargar_datos(es, args.archivo, bulk=args.bulk, **opciones_carga):
+            return
+    
     # Mostrar estadísticas
     mostrar_estadisticas(es)
     
     # Esperar un momento para que los datos se indexen completamente
     time.sleep(2)
     
-    print("\n" + "=" * 50)
-    print("🔍 EJECUTANDO CONSULTAS DE EJEMPLO")
-    print("=" * 50)
-    
     # Ejecutar consultas de ejemplo
-    buscar_por_nombre(es, "Logitech")
-    buscar_por_rango_precio(es, 100, 300)
-    buscar_por_categoria(es, "Accesorios")
-    busqueda_combinada(es)
-    agregaciones_ejemplo(es)
+    buscador = BusquedaCacheada(es) if args.cache else es
+    ejecutar_consultas(buscador)
+    
+    if args.cache:
+        mostrar_estadisticas_cache(buscador.cache)
     
     print("\n" + "=" * 50)
     print("✅ SCRIPT COMPLETADO EXITOSAMENTE")
@@ -349,5 +830,40 @@ def main():
     print("🔗 ElasticSearch API disponible en: http://localhost:9200")
     print("=" * 50)
 
+def main():
+    """Función principal"""
+    args = parsear_argumentos()
+    
+    print("🚀 INICIANDO SCRIPT DE ELASTICSEARCH - GRUPO 1")
+    print("=" * 50)
+    
+    metricas = None
+    if args.metricas or args.log_lentas:
+        metricas = Metricas(args.umbral_lento_ms, args.log_lentas)
+    
+    if args.local:
+        ejecutar_local(args)
+        return
+    
+    # Conectar a ElasticSearch
+    es = conectar_elasticsearch(metricas)
+    if not es:
+        # Sin cluster solo pueden ejecutarse las consultas, sobre el motor local
+        if not (args.revertir or args.sincronizar or args.reconstruir):
+            print("⚠️  Se usará el motor de búsqueda local")
+            if metricas is not None:
+                print("⚠️  Sin cluster no hay llamadas que medir: se ignoran --metricas y --log-lentas")
+            ejecutar_local(args)
+        return
+    
+    try:
+        ejecutar(es, args)
+    finally:
+        if metricas is not None:
+            mostrar_resumen_metricas(metricas)
+            if args.metricas:
+                metricas.exportar(args.metricas)
+                print(f"📡 Métricas exportadas a '{args.metricas}'")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Constructor de consultas para el índice de productos.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Separa las cláusulas que puntúan (contexto 'query') de los filtros que no
+puntúan (contexto 'filter', cacheables por ElasticSearch), limita el conteo
+exacto de resultados y proyecta solo los campos de _source que se usan.
+Con el índice ordenado por precio ('index.sort'), las consultas ordenadas
+por precio pueden terminar antes de recorrer todos los documentos.
+"""
+
+import copy
+
+# Conteo de resultados: por encima de este valor se informa como cota inferior
+TRACK_TOTAL_HITS = 1000
+
+class ConstructorConsulta:
+    """Arma el cuerpo de una búsqueda de forma incremental
+
+    Ejemplo::
+
+        cuerpo = (ConstructorConsulta()
+                  .filtro_rango("precio", gte=100, lte=300)
+                  .ordenar("precio")
+                  .campos(["nombre", "precio"])
+                  .construir())
+    """
+
+    def __init__(self):
+        self._must = []
+        self._filter = []
+        self._should = []
+        self._minimo_should = None
+        self._orden = []
+        self._campos = None
+        self._tamano = None
+        self._highlight = None
+        self._aggs = {}
+        self._track_total_hits = TRACK_TOTAL_HITS
+
+    def debe(self, clausula):
+        """Agrega una cláusula que puntúa y debe cumplirse (match, fuzzy...)"""
+        self._must.append(clausula)
+        return self
+
+    def coincide(self, campo, texto):
+        """Búsqueda de texto completo sobre un campo (puntúa)"""
+        return self.debe({"match": {campo: texto}})
+
+    def filtro(self, clausula):
+        """Agrega una cláusula que no puntúa (contexto filter, cacheable)"""
+        self._filter.append(clausula)
+        return self
+
+    def filtro_termino(self, campo, valor):
+        """Filtra por valor exacto de un campo keyword o numérico"""
+        return self.filtro({"term": {campo: valor}})
+
+    def filtro_rango(self, campo, **limites):
+        """Filtra por rango (gte, gt, lte, lt); los límites None se ignoran"""
+        limites = {operador: valor for operador, valor in limites.items() if valor is not None}
+        return self.filtro({"range": {campo: limites}})
+
+    def deberia(self, clausula):
+        """Agrega una cláusula opcional que suma puntaje"""
+        self._should.append(clausula)
+        return self
+
+    def minimo_deberia(self, minimo):
+        """Cantidad mínima de cláusulas 'deberia' que deben cumplirse"""
+        self._minimo_should = minimo
+        return self
+
+    def ordenar(self, campo, orden="asc"):
+        """Agrega un criterio de ordenamiento"""
+        self._orden.append({campo: {"order": orden}})
+        return self
+
+    def campos(self, campos):
+        """Limita _source a los campos indicados"""
+        self._campos = list(campos)
+        return self
+
+    def tamano(self, tamano):
+        """Cantidad de documentos a devolver"""
+        self._tamano = tamano
+        return self
+
+    def resaltar(self, *campos):
+        """Activa el highlighting en los campos indicados"""
+        self._highlight = {"fields": {campo: {} for campo in campos}}
+        return self
+
+    def agregacion(self, nombre, definicion):
+        """Agrega una agregación con nombre"""
+        self._aggs[nombre] = definicion
+        return self
+
+    def contar_hasta(self, limite):
+        """Límite del conteo exacto (True = exacto, False = sin conteo)"""
+        self._track_total_hits = limite
+        return self
+
+    def _query(self):
+        if not (self._must or self._filter or self._should):
+            return None
+        # Una sola cláusula que puntúa no necesita envolverse en un bool
+        if len(self._must) == 1 and not (self._filter or self._should):
+            return copy.deepcopy(self._must[0])
+
+        bool_query = {}
+        if self._must:
+            bool_query["must"] = copy.deepcopy(self._must)
+        if self._filter:
+            bool_query["filter"] = copy.deepcopy(self._filter)
+        if self._should:
+            bool_query["should"] = copy.deepcopy(self._should)
+            if self._minimo_should is not None:
+                bool_query["minimum_should_match"] = self._minimo_should
+        return {"bool": bool_query}
+
+    def construir(self):
+        """Devuelve el cuerpo de la búsqueda"""
+        cuerpo = {}
+        query = self._query()
+        if query is not None:
+            cuerpo["query"] = query
+        if self._tamano is not None:
+            cuerpo["size"] = self._tamano
+        if self._orden:
+            cuerpo["sort"] = copy.deepcopy(self._orden)
+        if self._campos is not None:
+            cuerpo["_source"] = list(self._campos)
+        if self._highlight:
+            cuerpo["highlight"] = copy.deepcopy(self._highlight)
+        if self._aggs:
+            cuerpo["aggs"] = copy.deepcopy(self._aggs)
+        if self._track_total_hits is not True:
+            cuerpo["track_total_hits"] = self._track_total_hits
+        return cuerpo
+
+def formatear_total(total):
+    """Formatea hits.total, marcando con '≥' los conteos que alcanzaron el límite"""
+    if isinstance(total, int):
+        return str(total)
+    prefijo = "≥" if total.get("relation") == "gte" else ""
+    return f"{prefijo}{total['value']}"
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Consultas de ejemplo ejecutadas de forma concurrente con AsyncElasticsearch.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Las consultas independientes se lanzan en paralelo (limitadas por un
+semáforo) o se agrupan en una única petición _msearch, de modo que la
+latencia total es la de la consulta más lenta y no la suma de todas.
+Requiere el extra asíncrono del cliente: pip install aiohttp
+"""
+
+import argparse
+import asyncio
+import time
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import ConnectionError
+
+from cargar_datos import (
+    ES_HOST, ES_PORT, INDEX_NAME,
+    consulta_agregaciones, consulta_combinada, consulta_por_categoria,
+    consulta_por_nombre, consulta_por_rango_precio,
+    mostrar_agregaciones, mostrar_combinada, mostrar_por_categoria,
+    mostrar_por_nombre, mostrar_por_rango_precio
+)
+
+# Consultas en vuelo como máximo por cliente
+MAX_CONCURRENCIA = 8
+
+async def conectar_elasticsearch_async():
+    """Establece conexión asíncrona con ElasticSearch"""
+    es = AsyncElasticsearch([f"http://{ES_HOST}:{ES_PORT}"])
+    try:
+        info = await es.info()
+        print(f"✅ Conectado a ElasticSearch {info['version']['number']} (async)")
+        return es
+    except ConnectionError:
+        print("❌ Error: ElasticSearch no está disponible. Asegúrate de que Docker esté ejecutándose.")
+        await es.close()
+        return None
+
+async def ejecutar_concurrente(es, consultas, max_concurrencia=MAX_CONCURRENCIA):
+    """Ejecuta varias búsquedas en paralelo con un límite de concurrencia
+
+    ``consultas`` es una lista de tuplas (indice, cuerpo). Devuelve las
+    respuestas en el mismo orden; una consulta que falla devuelve la excepción
+    en su posición en lugar de cancelar las demás.
+    """
+    semaforo = asyncio.Semaphore(max_concurrencia)
+
+    async def ejecutar(indice, cuerpo):
+        async with semaforo:
+            return await es.search(index=indice, body=cuerpo)
+
+    return await asyncio.gather(
+        *(ejecutar(indice, cuerpo) for indice, cuerpo in consultas),
+        return_exceptions=True
+    )
+
+async def ejecutar_msearch(es, consultas, max_concurrencia=MAX_CONCURRENCIA):
+    """Agrupa varias búsquedas en una única petición _msearch
+
+    Devuelve las respuestas en el mismo orden que ``consultas``. Las búsquedas
+    que fallan en el servidor devuelven un RuntimeError con el error recibido.
+    """
+    searches = []
+    for indice, cuerpo in consultas:
+        searches.append({"index": indice})
+        searches.append(cuerpo)
+
+    response = await es.msearch(searches=searches, max_concurrent_searches=max_concurrencia)
+    return [
+        RuntimeError(respuesta['error']) if 'error' in respuesta else respuesta
+        for respuesta in response['responses']
+    ]
+
+def consultas_ejemplo():
+    """Devuelve las consultas de ejemplo junto con la función que muestra cada resultado"""
+    return [
+        (consulta_por_nombre("Logitech"), lambda r: mostrar_por_nombre(r, "Logitech")),
+        (consulta_por_rango_precio(100, 300), lambda r: mostrar_por_rango_precio(r, 100, 300)),
+        (consulta_por_categoria("Accesorios"), lambda r: mostrar_por_categoria(r, "Accesorios")),
+        (consulta_combinada(), mostrar_combinada),
+        (consulta_agregaciones(), mostrar_agregaciones)
+    ]
+
+async def ejecutar_consultas_ejemplo(es, msearch=False, max_concurrencia=MAX_CONCURRENCIA):
+    """Ejecuta las consultas de ejemplo de forma concurrente o con _msearch"""
+    ejemplos = consultas_ejemplo()
+    consultas = [(INDEX_NAME, cuerpo) for cuerpo, _ in ejemplos]
+
+    inicio = time.perf_counter()
+    if msearch:
+        respuestas = await ejecutar_msearch(es, consultas, max_concurrencia)
+    else:
+        respuestas = await ejecutar_concurrente(es, consultas, max_concurrencia)
+    duracion = time.perf_counter() - inicio
+
+    for (_, mostrar), respuesta in zip(ejemplos, respuestas):
+        if isinstance(respuesta, Exception):
+            print(f"❌ Error en consulta: {respuesta}")
+            continue
+        try:
+            mostrar(respuesta)
+        except Exception as e:
+            print(f"❌ Error en consulta: {e}")
+
+    modo = "_msearch" if msearch else f"concurrencia {max_concurrencia}"
+    print(f"\n⏱️  {len(consultas)} consultas en {duracion * 1000:.1f} ms ({modo})")
+
+async def main_async(args):
+    """Función principal asíncrona"""
+    es = await conectar_elasticsearch_async()
+    if not es:
+        return
+    try:
+        await ejecutar_consultas_ejemplo(es, msearch=args.msearch, max_concurrencia=args.concurrencia)
+    finally:
+        await es.close()
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(
+        description="Ejecuta las consultas de ejemplo en paralelo con AsyncElasticsearch"
+    )
+    parser.add_argument("--msearch", action="store_true",
+                        help="Agrupar todas las consultas en una única petición _msearch")
+    parser.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCIA,
+                        help=f"Consultas simultáneas como máximo (por defecto: {MAX_CONCURRENCIA})")
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Exportación en streaming del índice de productos.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Recorre el índice con point-in-time + search_after (sin el costo creciente
+de from/size), en varios slices en paralelo y filtrando _source, y escribe
+NDJSON (opcionalmente gzip) o Parquet con memoria constante. Un archivo de
+checkpoint guarda los últimos valores de ordenamiento de cada slice para
+poder reanudar la exportación si se interrumpe.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cargar_datos import INDEX_NAME, conectar_elasticsearch, definir_mapping
+
+FORMATOS = ["ndjson", "ndjson.gz", "parquet"]
+TAM_PAGINA = 1000
+SLICES = 4
+KEEP_ALIVE = "5m"
+FILAS_POR_ARCHIVO = 100000
+ARCHIVO_CHECKPOINT = "_checkpoint.json"
+
+# Orden estable entre distintos PIT, necesario para reanudar
+ORDEN = [{"id": "asc"}]
+
+class _EscritorNDJSON:
+    """Escribe un slice como NDJSON; cada página queda confirmada al escribirse"""
+
+    def __init__(self, directorio, slice_id, comprimir, estado):
+        extension = "ndjson.gz" if comprimir else "ndjson"
+        self.ruta = os.path.join(directorio, f"parte-{slice_id:03d}.{extension}")
+        self.comprimir = comprimir
+        # Descartar lo escrito después del último checkpoint
+        bytes_confirmados = estado.get("bytes", 0)
+        with open(self.ruta, 'ab') as archivo:
+            archivo.truncate(bytes_confirmados)
+
+    def escribir(self, documentos):
+        """Agrega los documentos y devuelve el estado a guardar en el checkpoint"""
+        # Cada página es un miembro gzip independiente: el archivo sigue siendo válido
+        abrir = gzip.open if self.comprimir else open
+        with abrir(self.ruta, 'at', encoding='utf-8') as archivo:
+            for documento in documentos:
+                archivo.write(json.dumps(documento, ensure_ascii=False) + "\n")
+        return {"bytes": os.path.getsize(self.ruta)}
+
+    def cerrar(self):
+        return None
+
+class _EscritorParquet:
+    """Escribe un slice como archivos Parquet de hasta FILAS_POR_ARCHIVO filas"""
+
+    def __init__(self, directorio, slice_id, campos, estado, filas_por_archivo=FILAS_POR_ARCHIVO):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("El formato parquet requiere pyarrow: pip install pyarrow")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.directorio = directorio
+        self.slice_id = slice_id
+        self.filas_por_archivo = filas_por_archivo
+        self.parte = estado.get("partes", 0)
+        self.esquema = self._esquema(campos)
+        self.columnas = {nombre: [] for nombre in self.esquema.names}
+        self.filas = 0
+
+    def _esquema(self, campos):
+        """Esquema Arrow derivado del mapping del índice"""
+        tipos = {"integer": self._pa.int64(), "long": self._pa.int64(), "float": self._pa.float64(),
+                 "double": self._pa.float64(), "boolean": self._pa.bool_()}
+        propiedades = definir_mapping()["mappings"]["properties"]
+        nombres = campos or list(propiedades)
+        return self._pa.schema([
+            (nombre, tipos.get(propiedades.get(nombre, {}).get("type"), self._pa.string()))
+            for nombre in nombres
+        ])
+
+    def escribir(self, documentos):
+        """Acumula los documentos; confirma un archivo al llegar al límite de filas"""
+        for documento in documentos:
+            for nombre, valores in self.columnas.items():
+                valores.append(documento.get(nombre))
+        self.filas += len(documentos)
+        if self.filas >= self.filas_por_archivo:
+            return self._volcar()
+        return None
+
+    def _volcar(self):
+        ruta = os.path.join(self.directorio, f"parte-{self.slice_id:03d}-{self.parte:05d}.parquet")
+        tabla = self._pa.table(self.columnas, schema=self.esquema)
+        self._pq.write_table(tabla, ruta, compression="zstd")
+        self.parte += 1
+        self.columnas = {nombre: [] for nombre in self.columnas}
+        self.filas = 0
+        return {"partes": self.parte}
+
+    def cerrar(self):
+        """Escribe las filas pendientes y devuelve el estado final"""
+        return self._volcar() if self.filas else None
+
+class Checkpoint:
+    """Estado de la exportación por slice, guardado de forma atómica"""
+
+    def __init__(self, directorio, configuracion):
+        self.ruta = os.path.join(directorio, ARCHIVO_CHECKPOINT)
+        self._lock = threading.Lock()
+        if os.path.exists(self.ruta):
+            with open(self.ruta, 'r', encoding='utf-8') as archivo:
+                guardado = json.load(archivo)
+            if guardado["configuracion"] != configuracion:
+                raise ValueError("El checkpoint existente corresponde a otra configuración de exportación")
+            self.slices = {int(k): v for k, v in guardado["slices"].items()}
+        else:
+            self.slices = {}
+        self.configuracion = configuracion
+
+    def estado(self, slice_id):
+        with self._lock:
+            return dict(self.slices.get(slice_id, {}))
+
+    def actualizar(self, slice_id, **valores):
+        with self._lock:
+            self.slices.setdefault(slice_id, {}).update(valores)
+            temporal = f"{self.ruta}.tmp"
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump({"configuracion": self.configuracion, "slices": self.slices}, archivo)
+            os.replace(temporal, self.ruta)
+
+def exportar_slice(es, pit, slice_id, slices, campos, directorio, formato, checkpoint,
+                   tam_pagina=TAM_PAGINA, keep_alive=KEEP_ALIVE):
+    """Exporta un slice página por página con search_after; devuelve los documentos escritos"""
+    estado = checkpoint.estado(slice_id)
+    if estado.get("terminado"):
+        return 0
+
+    if formato == "parquet":
+        escritor = _EscritorParquet(directorio, slice_id, campos, estado)
+    else:
+        escritor = _EscritorNDJSON(directorio, slice_id, formato == "ndjson.gz", estado)
+
+    search_after = estado.get("search_after")
+    documentos = estado.get("documentos", 0)
+    escritos = 0
+    pit_id = pit
+
+    while True:
+        cuerpo = {
+            "size": tam_pagina,
+            "pit": {"id": pit_id, "keep_alive": keep_alive},
+            "sort": ORDEN,
+            "_source": campos if campos else True,
+            "track_total_hits": False
+        }
+        if slices > 1:
+            # Slice por el campo 'id' para que la partición sea estable entre PIT
+            cuerpo["slice"] = {"id": slice_id, "max": slices, "field": "id"}
+        if search_after is not None:
+            cuerpo["search_after"] = search_after
+
+        response = es.search(body=cuerpo)
+        pit_id = response.get("pit_id", pit_id)
+        hits = response["hits"]["hits"]
+
+        if hits:
+            search_after = hits[-1]["sort"]
+            confirmado = escritor.escribir([hit["_source"] for hit in hits])
+            documentos += len(hits)
+            escritos += len(hits)
+            if confirmado is not None:
+                checkpoint.actualizar(slice_id, search_after=search_after, documentos=documentos, **confirmado)
+
+        if len(hits) < tam_pagina:
+            confirmado = escritor.cerrar()
+            checkpoint.actualizar(slice_id, search_after=search_after, documentos=documentos,
+                                  terminado=True, **(confirmado or {}))
+            return escritos
+
+def exportar(es, directorio, indice=INDEX_NAME, formato="ndjson", slices=SLICES, campos=None,
+             tam_pagina=TAM_PAGINA, keep_alive=KEEP_ALIVE):
+    """Exporta el índice completo a 'directorio', reanudando desde el checkpoint si existe"""
+    os.makedirs(directorio, exist_ok=True)
+    configuracion = {"indice": indice, "formato": formato, "slices": slices, "campos": campos}
+    checkpoint = Checkpoint(directorio, configuracion)
+
+    pit = es.open_point_in_time(index=indice, keep_alive=keep_alive)["id"]
+    inicio = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=slices) as ejecutor:
+            futuros = [
+                ejecutor.submit(exportar_slice, es, pit, slice_id, slices, campos, directorio,
+                                formato, checkpoint, tam_pagina, keep_alive)
+                for slice_id in range(slices)
+            ]
+            escritos = sum(futuro.result() for futuro in futuros)
+    finally:
+        es.close_point_in_time(id=pit)
+
+    total = sum(estado.get("documentos", 0) for estado in checkpoint.slices.values())
+    return {"escritos": escritos, "total": total, "segundos": time.perf_counter() - inicio}
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Exporta el índice de productos en streaming")
+    parser.add_argument("directorio", help="Directorio de salida (se reanuda si contiene un checkpoint)")
+    parser.add_argument("--indice", default=INDEX_NAME, help=f"Índice a exportar (por defecto: {INDEX_NAME})")
+    parser.add_argument("--formato", choices=FORMATOS, default="ndjson",
+                        help="Formato de salida (por defecto: ndjson)")
+    parser.add_argument("--slices", type=int, default=SLICES,
+                        help=f"Lectores en paralelo (por defecto: {SLICES})")
+    parser.add_argument("--campos", help="Campos de _source a exportar, separados por coma")
+    parser.add_argument("--tam-pagina", type=int, default=TAM_PAGINA,
+                        help=f"Documentos por página (por defecto: {TAM_PAGINA})")
+    parser.add_argument("--keep-alive", default=KEEP_ALIVE,
+                        help=f"Tiempo de vida del point-in-time entre páginas (por defecto: {KEEP_ALIVE})")
+    args = parser.parse_args()
+
+    es = conectar_elasticsearch()
+    if not es:
+        return
+
+    campos = args.campos.split(",") if args.campos else None
+    try:
+        resultado = exportar(es, args.directorio, args.indice, args.formato, args.slices,
+                             campos, args.tam_pagina, args.keep_alive)
+    except Exception as e:
+        print(f"❌ Error al exportar: {e}")
+        print("💡 Vuelve a ejecutar el mismo comando para reanudar desde el último checkpoint")
+        return
+
+    segundos = resultado["segundos"] or 1e-9
+    print(f"✅ Exportación completada en '{args.directorio}'")
+    print(f"   • Documentos escritos en esta ejecución: {resultado['escritos']}")
+    print(f"   • Documentos exportados en total: {resultado['total']}")
+    print(f"   • Throughput: {resultado['escritos'] / segundos:.0f} docs/s")
+
+if __name__ == "__main__":
+    main()
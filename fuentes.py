@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Lectura en streaming de catálogos de productos.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Soporta el formato de arreglo JSON de 'productos.json', NDJSON (un producto
+por línea) y ambos comprimidos con gzip. Los productos se entregan de a uno,
+por lo que la memoria usada no depende del tamaño del archivo.
+"""
+
+import gzip
+import json
+
+# Tamaño de los bloques leídos del archivo (en caracteres)
+TAM_BLOQUE = 64 * 1024
+
+_ESPACIOS = " \t\r\n"
+
+def _abrir(ruta):
+    """Abre el archivo en modo texto, descomprimiendo gzip si corresponde"""
+    with open(ruta, 'rb') as archivo:
+        cabecera = archivo.read(2)
+    if cabecera == b'\x1f\x8b':
+        return gzip.open(ruta, 'rt', encoding='utf-8')
+    return open(ruta, 'r', encoding='utf-8')
+
+def _leer_arreglo(archivo, buffer, tam_bloque):
+    """Recorre un arreglo JSON elemento por elemento sin cargarlo completo"""
+    decoder = json.JSONDecoder()
+    pos = 1  # Saltar el '['
+    fin_archivo = False
+    esperando_elemento = True
+
+    while True:
+        # Saltar espacios, leyendo más datos si el buffer se agota
+        while True:
+            while pos < len(buffer) and buffer[pos] in _ESPACIOS:
+                pos += 1
+            if pos < len(buffer) or fin_archivo:
+                break
+            buffer, pos = archivo.read(tam_bloque), 0
+            fin_archivo = not buffer
+
+        if pos >= len(buffer):
+            raise ValueError("Arreglo JSON incompleto: falta ']'")
+
+        caracter = buffer[pos]
+        if caracter == ']':
+            return
+        if not esperando_elemento:
+            if caracter != ',':
+                raise ValueError(f"Se esperaba ',' o ']' y se encontró {caracter!r}")
+            pos += 1
+            esperando_elemento = True
+            continue
+
+        try:
+            elemento, fin = decoder.raw_decode(buffer, pos)
+            # Un valor que termina justo en el borde del buffer podría estar truncado
+            completo = fin < len(buffer) or fin_archivo
+        except json.JSONDecodeError:
+            if fin_archivo:
+                raise
+            completo = False
+
+        if not completo:
+            # Conservar solo lo pendiente y agregar el siguiente bloque
+            bloque = archivo.read(tam_bloque)
+            fin_archivo = not bloque
+            buffer, pos = buffer[pos:] + bloque, 0
+            continue
+
+        yield elemento
+        pos = fin
+        esperando_elemento = False
+
+        # Descartar lo ya procesado para mantener el buffer acotado
+        if pos > tam_bloque:
+            buffer, pos = buffer[pos:], 0
+
+def _leer_ndjson(archivo, buffer):
+    """Recorre un archivo NDJSON línea por línea"""
+    lineas = iter(archivo)
+    pendiente = buffer
+
+    # El primer bloque ya leído puede contener varias líneas y una incompleta
+    while '\n' in pendiente:
+        linea, pendiente = pendiente.split('\n', 1)
+        if linea.strip():
+            yield json.loads(linea)
+    primera = pendiente + next(lineas, '')
+    if primera.strip():
+        yield json.loads(primera)
+
+    for linea in lineas:
+        if linea.strip():
+            yield json.loads(linea)
+
+def leer_productos(ruta, tam_bloque=TAM_BLOQUE):
+    """Genera los productos de un archivo JSON, NDJSON o gzip uno a uno
+
+    El formato se detecta por el contenido: un archivo que empieza con '['
+    se trata como arreglo JSON y cualquier otro como NDJSON.
+    """
+    with _abrir(ruta) as archivo:
+        # Saltar espacios iniciales (y un posible BOM) hasta el primer carácter útil
+        buffer = ''
+        while not buffer:
+            bloque = archivo.read(tam_bloque)
+            if not bloque:
+                return
+            buffer = bloque.lstrip(_ESPACIOS + '\ufeff')
+
+        if buffer[0] == '[':
+            yield from _leer_arreglo(archivo, buffer, tam_bloque)
+        else:
+            yield from _leer_ndjson(archivo, buffer)
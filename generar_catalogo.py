@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Generador determinista de catálogos sintéticos de productos.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Extiende el esquema de 'productos.json' a catálogos de 10^4 a 10^7 productos
+con distribuciones realistas de categoría, marca, precio, calificación,
+fecha de lanzamiento y descripciones en español. La misma semilla produce
+siempre el mismo catálogo. Los productos se escriben de a uno, así que la
+memoria usada no depende del tamaño del catálogo.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import random
+import time
+from datetime import date, timedelta
+
+SEMILLA = 42
+
+# Categoría -> (peso, tipos de producto, marcas, mediana de precio, dispersión)
+CATEGORIAS = {
+    "Computadoras": (0.14, ["Laptop", "Ultrabook", "Notebook", "PC de escritorio", "Mini PC"],
+                     ["HP", "Lenovo", "Dell", "Asus", "Acer", "Apple", "MSI"], 950, 0.45),
+    "Tablets": (0.07, ["Tablet", "iPad", "Tablet Android"],
+                ["Apple", "Samsung", "Lenovo", "Xiaomi", "Huawei"], 420, 0.5),
+    "Periféricos": (0.18, ["Monitor", "Webcam", "Impresora", "Escáner", "Proyector"],
+                    ["Samsung", "LG", "Logitech", "Epson", "Canon", "Dell", "BenQ"], 230, 0.6),
+    "Accesorios": (0.26, ["Mouse", "Teclado", "Mousepad", "Hub USB", "Soporte", "Cargador"],
+                   ["Logitech", "Corsair", "Razer", "HyperX", "Redragon", "Genius", "Anker"], 55, 0.7),
+    "Audio": (0.13, ["Auriculares", "Parlante", "Micrófono", "Barra de sonido", "Audífonos"],
+              ["Sony", "JBL", "Bose", "Sennheiser", "HyperX", "Audio-Technica"], 120, 0.65),
+    "Almacenamiento": (0.12, ["SSD", "Disco duro", "Pendrive", "Tarjeta microSD", "NAS"],
+                       ["Kingston", "Samsung", "Western Digital", "Seagate", "SanDisk", "Crucial"], 80, 0.7),
+    "Redes": (0.10, ["Router", "Switch", "Access Point", "Repetidor WiFi", "Adaptador de red"],
+              ["TP-Link", "Netgear", "Asus", "Ubiquiti", "Cisco", "Mercusys"], 90, 0.6),
+}
+
+ADJETIVOS = ["liviano", "compacto", "ergonómico", "inalámbrico", "silencioso", "resistente",
+             "portátil", "elegante", "potente", "eficiente", "versátil", "robusto"]
+CARACTERISTICAS = ["pantalla Full HD", "conexión Bluetooth 5.0", "puerto USB-C", "iluminación RGB",
+                   "batería de larga duración", "carga rápida", "resolución 4K", "WiFi 6",
+                   "cancelación de ruido", "sensor de alta precisión", "diseño sin bordes",
+                   "memoria de 16GB", "interfaz NVMe PCIe 4.0", "certificación energética",
+                   "botones programables", "ajuste de altura", "garantía extendida"]
+USOS = ["trabajo remoto", "gaming", "oficina", "estudiantes", "creadores de contenido",
+        "uso doméstico", "profesionales", "viajes"]
+
+FECHA_INICIO = date(2018, 1, 1)
+DIAS_RANGO = (date(2025, 9, 30) - FECHA_INICIO).days
+
+def _elegir_ponderado(rng, opciones, acumulados):
+    """Elige una opción según pesos acumulados"""
+    x = rng.random() * acumulados[-1]
+    for opcion, limite in zip(opciones, acumulados):
+        if x < limite:
+            return opcion
+    return opciones[-1]
+
+def generar_productos(cantidad, semilla=SEMILLA, id_inicial=1):
+    """Genera productos sintéticos de forma determinista uno a uno"""
+    rng = random.Random(semilla)
+    nombres = list(CATEGORIAS)
+    acumulados = []
+    total = 0
+    for nombre in nombres:
+        total += CATEGORIAS[nombre][0]
+        acumulados.append(total)
+
+    for i in range(cantidad):
+        categoria = _elegir_ponderado(rng, nombres, acumulados)
+        _, tipos, marcas, mediana, dispersion = CATEGORIAS[categoria]
+        tipo = rng.choice(tipos)
+        # Distribución tipo Zipf: pocas marcas concentran la mayoría de productos
+        marca = marcas[min(int(rng.paretovariate(1.2)) - 1, len(marcas) - 1)]
+        modelo = f"{rng.choice('ABCDEFGHKMPRSTVXZ')}{rng.randint(1, 999)}"
+
+        precio = round(math.exp(rng.gauss(math.log(mediana), dispersion)), 2)
+        calificacion = round(min(5.0, max(1.0, rng.gauss(4.2, 0.45))), 1)
+        fecha = FECHA_INICIO + timedelta(days=int(DIAS_RANGO * rng.random() ** 0.7))
+        stock = int(rng.expovariate(1 / 30))
+
+        caracteristicas = rng.sample(CARACTERISTICAS, 2)
+        descripcion = (f"{tipo} {rng.choice(ADJETIVOS)} con {caracteristicas[0]} y "
+                       f"{caracteristicas[1]}, ideal para {rng.choice(USOS)}")
+
+        yield {
+            "id": id_inicial + i,
+            "nombre": f"{tipo} {marca} {modelo}",
+            "categoria": categoria,
+            "descripcion": descripcion,
+            "precio": precio,
+            "marca": marca,
+            "stock": stock,
+            "calificacion": calificacion,
+            "fecha_lanzamiento": fecha.isoformat()
+        }
+
+def escribir_catalogo(productos, ruta, formato="ndjson"):
+    """Escribe los productos como NDJSON o arreglo JSON (gzip si la ruta termina en .gz)"""
+    abrir = gzip.open if ruta.endswith(".gz") else open
+    total = 0
+    with abrir(ruta, 'wt', encoding='utf-8') as archivo:
+        if formato == "json":
+            archivo.write("[\n")
+        for producto in productos:
+            linea = json.dumps(producto, ensure_ascii=False)
+            if formato == "json":
+                archivo.write(("  " if total == 0 else ",\n  ") + linea)
+            else:
+                archivo.write(linea + "\n")
+            total += 1
+        if formato == "json":
+            archivo.write("\n]\n")
+    return total
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético de productos")
+    parser.add_argument("cantidad", type=int, help="Cantidad de productos a generar")
+    parser.add_argument("salida", help="Archivo de salida (.ndjson, .json, opcionalmente .gz)")
+    parser.add_argument("--formato", choices=["ndjson", "json"], default=None,
+                        help="Formato de salida (por defecto se deduce de la extensión)")
+    parser.add_argument("--semilla", type=int, default=SEMILLA,
+                        help=f"Semilla del generador (por defecto: {SEMILLA})")
+    args = parser.parse_args()
+
+    base = args.salida[:-3] if args.salida.endswith(".gz") else args.salida
+    formato = args.formato or ("json" if base.endswith(".json") else "ndjson")
+    inicio = time.perf_counter()
+    total = escribir_catalogo(generar_productos(args.cantidad, args.semilla), args.salida, formato)
+    print(f"✅ {total} productos generados en '{args.salida}' ({time.perf_counter() - inicio:.1f} s)")
+
+if __name__ == "__main__":
+    main()
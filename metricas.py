@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Trazas y métricas de cada llamada del cliente a ElasticSearch.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Un transporte instrumentado registra, para cada llamada, el endpoint, el
+tiempo de serialización JSON, el tiempo de red, el 'took' del servidor, los
+bytes de la respuesta y los reintentos. Las métricas se exportan como
+histogramas en formato de texto de Prometheus o como JSON, y las llamadas
+que superan un umbral quedan en un log de consultas lentas con su cuerpo.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+from elastic_transport import Transport, Urllib3HttpNode
+
+UMBRAL_LENTO_MS = 500
+MAX_CUERPO_LENTO = 10000
+MAX_LENTAS_EN_MEMORIA = 1000
+
+BUCKETS_SEGUNDOS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+BUCKETS_BYTES = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+
+# Fase -> (nombre de la métrica, ayuda, buckets)
+HISTOGRAMAS = {
+    "total": ("es_cliente_total_segundos", "Duración total de la llamada en el cliente", BUCKETS_SEGUNDOS),
+    "serializacion": ("es_cliente_serializacion_segundos",
+                      "Tiempo de serialización y deserialización JSON", BUCKETS_SEGUNDOS),
+    "red": ("es_cliente_red_segundos", "Tiempo de red (ida y vuelta HTTP, todos los intentos)",
+            BUCKETS_SEGUNDOS),
+    "servidor": ("es_cliente_servidor_segundos", "Tiempo informado por el servidor ('took')",
+                 BUCKETS_SEGUNDOS),
+    "bytes_respuesta": ("es_cliente_respuesta_bytes", "Tamaño de la respuesta", BUCKETS_BYTES),
+}
+
+# Registro de la llamada en curso en cada hilo
+_actual = threading.local()
+
+class Histograma:
+    """Histograma acumulativo con buckets fijos, al estilo Prometheus"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * len(buckets)
+        self.cantidad = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.conteos[i] += 1
+                break
+        self.cantidad += 1
+        self.suma += valor
+        self.maximo = max(self.maximo, valor)
+
+    def acumulados(self):
+        """Devuelve pares (límite, conteo acumulado) incluyendo +Inf"""
+        total = 0
+        pares = []
+        for limite, conteo in zip(self.buckets, self.conteos):
+            total += conteo
+            pares.append((limite, total))
+        pares.append(("+Inf", self.cantidad))
+        return pares
+
+class Metricas:
+    """Registro de métricas por endpoint y log de consultas lentas"""
+
+    def __init__(self, umbral_lento_ms=UMBRAL_LENTO_MS, archivo_lentas=None):
+        self.umbral_lento_ms = umbral_lento_ms
+        self.archivo_lentas = archivo_lentas
+        self._lock = threading.Lock()
+        self._histogramas = {}
+        self._contadores = {}
+        self.lentas = []
+
+    def _sumar(self, nombre, endpoint, valor=1):
+        clave = (nombre, endpoint)
+        self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def registrar(self, registro):
+        """Agrega las mediciones de una llamada terminada"""
+        endpoint = registro["endpoint"]
+        with self._lock:
+            for fase, (_, _, buckets) in HISTOGRAMAS.items():
+                valor = registro.get(fase)
+                if valor is None:
+                    continue
+                clave = (fase, endpoint)
+                if clave not in self._histogramas:
+                    self._histogramas[clave] = Histograma(buckets)
+                self._histogramas[clave].observar(valor)
+            self._sumar("peticiones", endpoint)
+            self._sumar("reintentos", endpoint, max(0, registro["intentos"] - 1))
+            if registro.get("error"):
+                self._sumar("errores", endpoint)
+
+        if registro["total"] * 1000 >= self.umbral_lento_ms:
+            self._registrar_lenta(registro)
+
+    def _registrar_lenta(self, registro):
+        cuerpo = _texto_cuerpo(registro.get("cuerpo"))
+        entrada = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "endpoint": registro["endpoint"],
+            "metodo": registro["metodo"],
+            "target": registro["target"],
+            "total_ms": round(registro["total"] * 1000, 2),
+            "red_ms": round(registro["red"] * 1000, 2),
+            "serializacion_ms": round(registro["serializacion"] * 1000, 2),
+            "took_ms": registro["servidor"] * 1000 if registro.get("servidor") is not None else None,
+            "intentos": registro["intentos"],
+            "cuerpo": cuerpo[:MAX_CUERPO_LENTO] if cuerpo else cuerpo
+        }
+        with self._lock:
+            self.lentas.append(entrada)
+            del self.lentas[:-MAX_LENTAS_EN_MEMORIA]
+            if self.archivo_lentas:
+                with open(self.archivo_lentas, 'a', encoding='utf-8') as archivo:
+                    archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+    def como_prometheus(self):
+        """Exporta las métricas en formato de texto de Prometheus"""
+        lineas = []
+        with self._lock:
+            for fase, (nombre, ayuda, _) in HISTOGRAMAS.items():
+                series = sorted((e, h) for (f, e), h in self._histogramas.items() if f == fase)
+                if not series:
+                    continue
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} histogram")
+                for endpoint, histograma in series:
+                    for limite, conteo in histograma.acumulados():
+                        lineas.append(f'{nombre}_bucket{{endpoint="{endpoint}",le="{limite}"}} {conteo}')
+                    lineas.append(f'{nombre}_sum{{endpoint="{endpoint}"}} {histograma.suma}')
+                    lineas.append(f'{nombre}_count{{endpoint="{endpoint}"}} {histograma.cantidad}')
+            for contador in ("peticiones", "reintentos", "errores"):
+                series = sorted((e, v) for (c, e), v in self._contadores.items() if c == contador)
+                if not series:
+                    continue
+                nombre = f"es_cliente_{contador}_total"
+                lineas.append(f"# TYPE {nombre} counter")
+                for endpoint, valor in series:
+                    lineas.append(f'{nombre}{{endpoint="{endpoint}"}} {valor}')
+        return "\n".join(lineas) + "\n"
+
+    def como_dict(self):
+        """Exporta las métricas como diccionario serializable a JSON"""
+        with self._lock:
+            endpoints = {}
+            for (fase, endpoint), h in self._histogramas.items():
+                endpoints.setdefault(endpoint, {})[fase] = {
+                    "cantidad": h.cantidad,
+                    "suma": h.suma,
+                    "promedio": h.suma / h.cantidad if h.cantidad else 0.0,
+                    "maximo": h.maximo,
+                    "buckets": [[limite, conteo] for limite, conteo in h.acumulados()]
+                }
+            for (contador, endpoint), valor in self._contadores.items():
+                endpoints.setdefault(endpoint, {})[contador] = valor
+            return {"endpoints": endpoints, "lentas": list(self.lentas)}
+
+    def exportar(self, ruta):
+        """Guarda las métricas en 'ruta': JSON si termina en .json, Prometheus si no"""
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            if ruta.endswith(".json"):
+                json.dump(self.como_dict(), archivo, ensure_ascii=False, indent=2)
+            else:
+                archivo.write(self.como_prometheus())
+
+def _texto_cuerpo(cuerpo):
+    """Convierte el cuerpo de la petición a texto (NDJSON para _bulk y _msearch)"""
+    if cuerpo is None or isinstance(cuerpo, str):
+        return cuerpo
+    if isinstance(cuerpo, bytes):
+        return cuerpo.decode("utf-8", "replace")
+    if isinstance(cuerpo, (list, tuple)):
+        return "\n".join(_texto_cuerpo(linea) if isinstance(linea, (str, bytes))
+                         else json.dumps(linea, ensure_ascii=False, default=str) for linea in cuerpo)
+    return json.dumps(cuerpo, ensure_ascii=False, default=str)
+
+def nombre_endpoint(target):
+    """Deduce el endpoint de la ruta HTTP ('/productos/_search?x' -> '_search')"""
+    partes = [p for p in target.split("?")[0].split("/") if p]
+    for parte in partes:
+        if parte.startswith("_"):
+            return parte
+    return "indice" if partes else "raiz"
+
+class _SerializadoresMedidos:
+    """Envuelve la colección de serializadores midiendo dumps y loads"""
+
+    def __init__(self, serializadores):
+        self._serializadores = serializadores
+
+    def __getattr__(self, nombre):
+        return getattr(self._serializadores, nombre)
+
+    def dumps(self, data, mimetype=None):
+        inicio = time.perf_counter()
+        try:
+            return self._serializadores.dumps(data, mimetype)
+        finally:
+            _sumar_actual("serializacion", time.perf_counter() - inicio)
+
+    def loads(self, data, mimetype=None):
+        inicio = time.perf_counter()
+        try:
+            return self._serializadores.loads(data, mimetype)
+        finally:
+            _sumar_actual("serializacion", time.perf_counter() - inicio)
+
+def _sumar_actual(campo, valor):
+    registro = getattr(_actual, "registro", None)
+    if registro is not None:
+        registro[campo] = registro.get(campo, 0) + valor
+
+class NodoInstrumentado(Urllib3HttpNode):
+    """Nodo HTTP que mide cada intento de la petición y los bytes recibidos"""
+
+    def perform_request(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            respuesta = super().perform_request(*args, **kwargs)
+        finally:
+            _sumar_actual("red", time.perf_counter() - inicio)
+            _sumar_actual("intentos", 1)
+        _sumar_actual("bytes_respuesta", len(respuesta.body or b""))
+        return respuesta
+
+class TransporteInstrumentado(Transport):
+    """Transporte que registra cada llamada en el objeto Metricas asociado
+
+    Se usa a través de ``crear_cliente_instrumentado``, que asigna las
+    métricas a la clase creada para ese cliente.
+    """
+
+    metricas = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.serializers = _SerializadoresMedidos(self.serializers)
+
+    def perform_request(self, method, target, *, body=None, **kwargs):
+        registro = {
+            "endpoint": nombre_endpoint(target), "metodo": method, "target": target,
+            "cuerpo": body, "serializacion": 0.0, "red": 0.0, "intentos": 0
+        }
+        anterior = getattr(_actual, "registro", None)
+        _actual.registro = registro
+        inicio = time.perf_counter()
+        try:
+            respuesta = super().perform_request(method, target, body=body, **kwargs)
+            # El cliente convierte después los 4xx/5xx en excepciones; 404 es una respuesta normal
+            registro["error"] = respuesta.meta.status >= 400 and respuesta.meta.status != 404
+            if isinstance(respuesta.body, dict) and isinstance(respuesta.body.get("took"), (int, float)):
+                registro["servidor"] = respuesta.body["took"] / 1000
+            return respuesta
+        except Exception:
+            registro["error"] = True
+            raise
+        finally:
+            registro["total"] = time.perf_counter() - inicio
+            _actual.registro = anterior
+            if self.metricas is not None:
+                self.metricas.registrar(registro)
+
+def crear_cliente_instrumentado(hosts, metricas, **opciones):
+    """Crea un cliente Elasticsearch cuyas llamadas quedan registradas en 'metricas'"""
+    from elasticsearch import Elasticsearch
+
+    transporte = type("TransporteConMetricas", (TransporteInstrumentado,), {"metricas": metricas})
+    return Elasticsearch(hosts, transport_class=transporte, node_class=NodoInstrumentado, **opciones)
+
+def mostrar_resumen_metricas(metricas):
+    """Muestra un resumen por endpoint: llamadas, tiempos promedio y reintentos"""
+    datos = metricas.como_dict()["endpoints"]
+    print(f"\n📡 MÉTRICAS DEL CLIENTE:")
+    print(f"   {'Endpoint':<16}{'Llamadas':>9}{'Total ms':>10}{'Red ms':>9}{'JSON ms':>9}"
+          f"{'Took ms':>9}{'KB resp':>9}{'Reint.':>8}{'Errores':>9}")
+    for endpoint in sorted(datos):
+        d = datos[endpoint]
+        promedio = lambda fase, escala=1000: d[fase]["promedio"] * escala if fase in d else 0.0
+        print(f"   {endpoint:<16}{d.get('peticiones', 0):>9}{promedio('total'):>10.2f}{promedio('red'):>9.2f}"
+              f"{promedio('serializacion'):>9.2f}{promedio('servidor'):>9.2f}"
+              f"{promedio('bytes_respuesta', 1 / 1024):>9.1f}{d.get('reintentos', 0):>8}{d.get('errores', 0):>9}")
+    if metricas.lentas:
+        print(f"   🐢 Llamadas lentas (≥{metricas.umbral_lento_ms} ms): {len(metricas.lentas)}")
@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+Motor de búsqueda local, en memoria, para trabajar sin cluster.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Indexa los mismos archivos de productos que cargar_datos.py y responde el
+subconjunto del query DSL que usan el script y consultas_ejemplo.md (match,
+multi_match, term, terms, range, bool, fuzzy, wildcard, sort, highlight y
+las agregaciones terms/stats/avg/min/max/sum/range) con respuestas del mismo
+formato que ElasticSearch.
+
+Los campos de texto usan un índice invertido con un analizador al estilo
+español (minúsculas, sin acentos, stopwords y stemming liviano) y puntaje
+BM25. Los campos numéricos y de fecha se guardan como columnas NumPy y los
+keyword como códigos enteros, de modo que filtros y agregaciones son
+operaciones vectorizadas.
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import re
+import time
+import unicodedata
+from datetime import datetime, timezone
+
+import numpy as np
+
+from cargar_datos import INDEX_NAME, definir_mapping
+from fuentes import leer_productos
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TAM_POR_DEFECTO = 10
+TERMS_TAM_POR_DEFECTO = 10
+
+STOPWORDS = {
+    "a", "al", "con", "de", "del", "e", "el", "en", "es", "la", "las", "lo", "los",
+    "o", "para", "por", "que", "se", "sin", "su", "sus", "u", "un", "una", "unos", "unas", "y"
+}
+
+_TOKEN = re.compile(r"\w+")
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita los acentos"""
+    descompuesto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+def raiz(termino):
+    """Stemming liviano del español: quita plurales y vocal final de género"""
+    if len(termino) < 5:
+        return termino
+    if termino[-1] in "oae":
+        return termino[:-1]
+    if termino[-1] == "s":
+        if termino.endswith("eses"):
+            return termino[:-2]
+        if termino.endswith("ces"):
+            return termino[:-3] + "z"
+        if termino[-2] in "oae":
+            return termino[:-2]
+    return termino
+
+def analizar(texto):
+    """Convierte un texto en la lista de términos que se indexan o buscan"""
+    return [raiz(t) for t in _TOKEN.findall(normalizar(texto)) if t not in STOPWORDS]
+
+def _tokens_originales(texto):
+    """Tokens del texto original con su posición, para el resaltado"""
+    return [(m.start(), m.end(), raiz(normalizar(m.group()))) for m in _TOKEN.finditer(texto)]
+
+def _distancia(a, b, maximo):
+    """Distancia de Damerau-Levenshtein (transposiciones adyacentes), acotada a 'maximo'"""
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            actual[j] = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo)
+            if (anterior2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                actual[j] = min(actual[j], anterior2[j - 2] + 1)
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior2, anterior = anterior, actual
+    return anterior[-1]
+
+def _fuzziness(valor, termino):
+    """Traduce 'fuzziness' (número o AUTO) a la distancia máxima permitida"""
+    if valor is None:
+        return 0
+    if str(valor).upper().startswith("AUTO"):
+        return 0 if len(termino) <= 2 else 1 if len(termino) <= 5 else 2
+    return int(valor)
+
+def _fecha_a_ms(valor):
+    """Convierte una fecha ISO (o epoch en ms) a milisegundos desde epoch"""
+    if valor is None:
+        return math.nan
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    fecha = datetime.fromisoformat(str(valor).replace("Z", "+00:00"))
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.timestamp() * 1000
+
+class _CampoTexto:
+    """Índice invertido de un campo de texto con estadísticas para BM25"""
+
+    def __init__(self, textos):
+        postings = {}
+        self.longitudes = np.zeros(len(textos), dtype=np.float32)
+        for doc, texto in enumerate(textos):
+            terminos = analizar(texto) if texto is not None else []
+            self.longitudes[doc] = len(terminos)
+            frecuencias = {}
+            for termino in terminos:
+                frecuencias[termino] = frecuencias.get(termino, 0) + 1
+            for termino, tf in frecuencias.items():
+                postings.setdefault(termino, ([], []))
+                postings[termino][0].append(doc)
+                postings[termino][1].append(tf)
+        self.postings = {
+            termino: (np.array(docs, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for termino, (docs, tfs) in postings.items()
+        }
+        self.promedio = float(self.longitudes.mean()) if len(textos) and self.longitudes.mean() else 1.0
+        self.cantidad = len(textos)
+
+    def puntajes(self, termino, boost=1.0):
+        """Devuelve (documentos, puntaje BM25) del término, o None si no aparece"""
+        posting = self.postings.get(termino)
+        if posting is None:
+            return None
+        docs, tf = posting
+        idf = math.log(1 + (self.cantidad - len(docs) + 0.5) / (len(docs) + 0.5))
+        norma = BM25_K1 * (1 - BM25_B + BM25_B * self.longitudes[docs] / self.promedio)
+        # Sin el factor (k1 + 1) del numerador, como Lucene 8+ (y ElasticSearch 8)
+        return docs, boost * idf * tf / (tf + norma)
+
+    def expandir(self, termino, distancia):
+        """Términos del vocabulario a distancia de edición menor o igual a 'distancia'"""
+        if distancia == 0:
+            return [termino] if termino in self.postings else []
+        return [t for t in self.postings if _distancia(termino, t, distancia) <= distancia]
+
+class _CampoKeyword:
+    """Columna keyword codificada con diccionario ordenado (código -1 = ausente)"""
+
+    def __init__(self, valores):
+        self.vocabulario = sorted({v for v in valores if v is not None})
+        posicion = {v: i for i, v in enumerate(self.vocabulario)}
+        self.codigos = np.array([posicion.get(v, -1) if v is not None else -1 for v in valores],
+                                dtype=np.int32)
+
+    def igual(self, valor):
+        codigo = self._codigo(valor)
+        return self.codigos == codigo if codigo is not None else np.zeros(len(self.codigos), dtype=bool)
+
+    def _codigo(self, valor):
+        i = np.searchsorted(self.vocabulario, valor) if self.vocabulario else 0
+        return i if i < len(self.vocabulario) and self.vocabulario[i] == valor else None
+
+    def patron(self, patron):
+        """Documentos cuyo valor cumple un patrón con * y ?"""
+        codigos = [i for i, v in enumerate(self.vocabulario) if fnmatch.fnmatchcase(v, patron)]
+        return np.isin(self.codigos, codigos)
+
+    def clave_orden(self):
+        """Valores para ordenar: el código respeta el orden alfabético"""
+        return np.where(self.codigos >= 0, self.codigos, np.nan).astype(np.float64)
+
+class MotorLocal:
+    """Índice de productos en memoria con una interfaz ``search`` como la del cliente
+
+    Ejemplo::
+
+        motor = MotorLocal.desde_archivo("productos.json")
+        response = motor.search(index="productos", body={"query": {"match": {"nombre": "mouse"}}})
+    """
+
+    def __init__(self, productos, indice=INDEX_NAME, mapping=None):
+        self.indice = indice
+        self.documentos = list(productos)
+        propiedades = (mapping or definir_mapping())["mappings"]["properties"]
+
+        self.texto = {}
+        self.keyword = {}
+        self.numerico = {}
+        self.fechas = set()
+        for campo, definicion in propiedades.items():
+            valores = [d.get(campo) for d in self.documentos]
+            tipo = definicion.get("type")
+            if tipo == "text":
+                self.texto[campo] = _CampoTexto(valores)
+                for subcampo, sub in definicion.get("fields", {}).items():
+                    if sub.get("type") == "keyword":
+                        self.keyword[f"{campo}.{subcampo}"] = _CampoKeyword(valores)
+            elif tipo == "keyword":
+                self.keyword[campo] = _CampoKeyword(valores)
+            elif tipo == "date":
+                self.fechas.add(campo)
+                self.numerico[campo] = np.array([_fecha_a_ms(v) for v in valores], dtype=np.float64)
+            else:
+                self.numerico[campo] = np.array(
+                    [v if v is not None else math.nan for v in valores], dtype=np.float64)
+
+    @classmethod
+    def desde_archivo(cls, ruta, indice=INDEX_NAME):
+        """Crea el motor con los productos de un archivo JSON, NDJSON o .gz"""
+        return cls(leer_productos(ruta), indice)
+
+    @property
+    def cantidad(self):
+        return len(self.documentos)
+
+    def ping(self):
+        return True
+
+    def count(self, index=None, body=None, **parametros):
+        """Cuenta los documentos que cumplen la consulta"""
+        consulta = (body or {}).get("query", {"match_all": {}})
+        coincide, _ = self._evaluar(consulta, {})
+        return {"count": int(coincide.sum()), "_shards": {"total": 1, "successful": 1, "failed": 0}}
+
+    def search(self, index=None, body=None, **parametros):
+        """Ejecuta una búsqueda y devuelve una respuesta con el formato de ElasticSearch"""
+        inicio = time.perf_counter()
+        cuerpo = dict(body or {})
+        cuerpo.update(parametros)
+
+        terminos = {}
+        coincide, puntajes = self._evaluar(cuerpo.get("query", {"match_all": {}}), terminos)
+        encontrados = np.flatnonzero(coincide)
+
+        orden = self._normalizar_orden(cuerpo.get("sort"))
+        desde = cuerpo.get("from", 0)
+        tamano = cuerpo.get("size", TAM_POR_DEFECTO)
+        seleccion = self._ordenar(encontrados, puntajes, orden)[desde:desde + tamano]
+
+        hits = [self._hit(doc, puntajes, orden, cuerpo, terminos) for doc in seleccion]
+        total = len(encontrados)
+        response = {
+            "timed_out": False,
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {
+                "total": self._total(total, cuerpo.get("track_total_hits", 10000)),
+                "max_score": max((h["_score"] for h in hits if h["_score"] is not None), default=None),
+                "hits": hits
+            }
+        }
+        if response["hits"]["total"] is None:
+            del response["hits"]["total"]
+        aggs = cuerpo.get("aggs") or cuerpo.get("aggregations")
+        if aggs:
+            response["aggregations"] = self._agregar(aggs, coincide)
+        response["took"] = int((time.perf_counter() - inicio) * 1000)
+        return response
+
+    @staticmethod
+    def _total(total, limite):
+        if limite is False:
+            return None
+        if limite is True or total <= limite:
+            return {"value": total, "relation": "eq"}
+        return {"value": limite, "relation": "gte"}
+
+    # --- Consultas ---
+
+    def _evaluar(self, consulta, terminos):
+        """Devuelve (máscara de documentos, puntajes) de una consulta del DSL"""
+        if len(consulta) != 1:
+            raise ValueError(f"Consulta inválida: {consulta}")
+        tipo, parametros = next(iter(consulta.items()))
+        n = self.cantidad
+
+        if tipo == "match_all":
+            return np.ones(n, dtype=bool), np.full(n, float(parametros.get("boost", 1.0)))
+        if tipo == "match":
+            campo, opciones = self._campo_y_opciones(parametros, "query")
+            return self._match(campo, opciones, terminos)
+        if tipo == "multi_match":
+            return self._multi_match(parametros, terminos)
+        if tipo == "term":
+            campo, opciones = self._campo_y_opciones(parametros, "value")
+            return self._constante(self._igual(campo, opciones["value"], terminos), opciones)
+        if tipo == "terms":
+            campo, valores = next((c, v) for c, v in parametros.items() if c != "boost")
+            coincide = np.zeros(n, dtype=bool)
+            for valor in valores:
+                coincide |= self._igual(campo, valor, terminos)
+            return self._constante(coincide, parametros)
+        if tipo == "range":
+            campo, limites = next(iter(parametros.items()))
+            return self._constante(self._rango(campo, limites), limites)
+        if tipo == "fuzzy":
+            campo, opciones = self._campo_y_opciones(parametros, "value")
+            return self._fuzzy(campo, opciones, terminos)
+        if tipo in ("wildcard", "prefix"):
+            campo, opciones = self._campo_y_opciones(parametros, "value")
+            patron = opciones["value"] + ("*" if tipo == "prefix" else "")
+            return self._constante(self._patron(campo, patron), opciones)
+        if tipo == "bool":
+            return self._bool(parametros, terminos)
+        raise ValueError(f"Consulta no soportada por el motor local: {tipo}")
+
+    @staticmethod
+    def _campo_y_opciones(parametros, clave):
+        campo, valor = next(iter(parametros.items()))
+        return campo, valor if isinstance(valor, dict) else {clave: valor}
+
+    def _constante(self, coincide, opciones):
+        return coincide, coincide * float(opciones.get("boost", 1.0))
+
+    def _puntuar_terminos(self, campo, lista_terminos, operador="or", boost=1.0):
+        """Suma BM25 de una lista de grupos de términos (cada grupo es una alternativa)"""
+        indice = self.texto[campo]
+        puntajes = np.zeros(self.cantidad)
+        coincidencias = np.zeros(self.cantidad, dtype=np.int32)
+        for alternativas in lista_terminos:
+            mejor = np.zeros(self.cantidad)
+            for termino in alternativas:
+                resultado = indice.puntajes(termino, boost)
+                if resultado is not None:
+                    docs, valores = resultado
+                    mejor[docs] = np.maximum(mejor[docs], valores)
+            puntajes += mejor
+            coincidencias += mejor > 0
+        if operador == "and":
+            coincide = coincidencias == len(lista_terminos) if lista_terminos else coincidencias > 0
+        else:
+            coincide = coincidencias > 0
+        return coincide, np.where(coincide, puntajes, 0.0)
+
+    def _match(self, campo, opciones, terminos):
+        texto = opciones["query"]
+        boost = float(opciones.get("boost", 1.0))
+        if campo not in self.texto:
+            return self._constante(self._igual(campo, texto, terminos), opciones)
+        grupos = []
+        for termino in analizar(texto):
+            distancia = _fuzziness(opciones.get("fuzziness"), termino)
+            alternativas = self.texto[campo].expandir(termino, distancia) if distancia else [termino]
+            terminos.setdefault(campo, set()).update(alternativas)
+            grupos.append(alternativas)
+        return self._puntuar_terminos(campo, grupos, opciones.get("operator", "or").lower(), boost)
+
+    def _multi_match(self, parametros, terminos):
+        coincide = np.zeros(self.cantidad, dtype=bool)
+        puntajes = np.zeros(self.cantidad)
+        for campo in parametros["fields"]:
+            campo, _, boost = campo.partition("^")
+            opciones = dict(parametros, boost=float(boost or 1.0) * float(parametros.get("boost", 1.0)))
+            c, p = self._match(campo, opciones, terminos)
+            coincide |= c
+            puntajes = np.maximum(puntajes, p)  # best_fields
+        return coincide, puntajes
+
+    def _fuzzy(self, campo, opciones, terminos):
+        # Como en ElasticSearch el valor no se analiza; solo se normaliza
+        valor = normalizar(opciones["value"])
+        if campo not in self.texto:
+            return self._constante(self._patron(campo, opciones["value"]), opciones)
+        distancia = _fuzziness(opciones.get("fuzziness", "AUTO"), valor)
+        alternativas = self.texto[campo].expandir(valor, distancia)
+        terminos.setdefault(campo, set()).update(alternativas)
+        return self._puntuar_terminos(campo, [alternativas], boost=float(opciones.get("boost", 1.0)))
+
+    def _igual(self, campo, valor, terminos):
+        if campo in self.keyword:
+            return self.keyword[campo].igual(valor)
+        if campo in self.numerico:
+            objetivo = _fecha_a_ms(valor) if campo in self.fechas else float(valor)
+            return self.numerico[campo] == objetivo
+        if campo in self.texto:
+            # term sobre un campo text busca el término indexado, sin analizar
+            terminos.setdefault(campo, set()).add(valor)
+            docs = self.texto[campo].postings.get(valor, (np.array([], dtype=np.int32), None))[0]
+            coincide = np.zeros(self.cantidad, dtype=bool)
+            coincide[docs] = True
+            return coincide
+        return np.zeros(self.cantidad, dtype=bool)
+
+    def _rango(self, campo, limites):
+        if campo not in self.numerico:
+            raise ValueError(f"El motor local solo admite range sobre campos numéricos o fechas: {campo}")
+        columna = self.numerico[campo]
+        convertir = _fecha_a_ms if campo in self.fechas else float
+        coincide = ~np.isnan(columna)
+        with np.errstate(invalid="ignore"):
+            if limites.get("gte") is not None:
+                coincide &= columna >= convertir(limites["gte"])
+            if limites.get("gt") is not None:
+                coincide &= columna > convertir(limites["gt"])
+            if limites.get("lte") is not None:
+                coincide &= columna <= convertir(limites["lte"])
+            if limites.get("lt") is not None:
+                coincide &= columna < convertir(limites["lt"])
+        return coincide
+
+    def _patron(self, campo, patron):
+        if campo not in self.keyword:
+            raise ValueError(f"El motor local solo admite wildcard/prefix sobre campos keyword: {campo}")
+        return self.keyword[campo].patron(patron)
+
+    def _bool(self, parametros, terminos):
+        n = self.cantidad
+        coincide = np.ones(n, dtype=bool)
+        puntajes = np.zeros(n)
+        lista = lambda clave: parametros.get(clave, []) if isinstance(parametros.get(clave, []), list) \
+            else [parametros[clave]]
+
+        for clausula in lista("must"):
+            c, p = self._evaluar(clausula, terminos)
+            coincide &= c
+            puntajes += p
+        for clausula in lista("filter"):
+            coincide &= self._evaluar(clausula, {})[0]
+        for clausula in lista("must_not"):
+            coincide &= ~self._evaluar(clausula, {})[0]
+
+        should = lista("should")
+        if should:
+            cumplidas = np.zeros(n, dtype=np.int32)
+            for clausula in should:
+                c, p = self._evaluar(clausula, terminos)
+                cumplidas += c
+                puntajes += np.where(c, p, 0.0)
+            minimo = parametros.get("minimum_should_match")
+            if minimo is None:
+                minimo = 0 if (lista("must") or lista("filter")) else 1
+            coincide &= cumplidas >= self._minimo(minimo, len(should))
+
+        puntajes *= float(parametros.get("boost", 1.0))
+        return coincide, np.where(coincide, puntajes, 0.0)
+
+    @staticmethod
+    def _minimo(minimo, cantidad):
+        """Interpreta minimum_should_match como número o porcentaje"""
+        texto = str(minimo)
+        if texto.endswith("%"):
+            valor = int(cantidad * abs(float(texto[:-1])) / 100)
+            return cantidad - valor if texto.startswith("-") else valor
+        valor = int(texto)
+        return cantidad + valor if valor < 0 else valor
+
+    # --- Orden y resultados ---
+
+    @staticmethod
+    def _normalizar_orden(sort):
+        """Convierte 'sort' a una lista de (campo, orden)"""
+        if not sort:
+            return []
+        criterios = []
+        for criterio in sort if isinstance(sort, list) else [sort]:
+            if isinstance(criterio, str):
+                criterios.append((criterio, "desc" if criterio == "_score" else "asc"))
+                continue
+            campo, opciones = next(iter(criterio.items()))
+            orden = opciones.get("order", "asc") if isinstance(opciones, dict) else opciones
+            criterios.append((campo, orden))
+        return criterios
+
+    def _clave(self, campo):
+        if campo in self.numerico:
+            return self.numerico[campo]
+        if campo in self.keyword:
+            return self.keyword[campo].clave_orden()
+        raise ValueError(f"El motor local no puede ordenar por el campo: {campo}")
+
+    def _ordenar(self, docs, puntajes, orden):
+        """Ordena los documentos encontrados; los valores ausentes van al final"""
+        if not orden:
+            orden = [("_score", "desc")]
+        claves = []
+        for campo, sentido in orden:
+            valores = puntajes[docs] if campo == "_score" else self._clave(campo)[docs]
+            valores = -valores if sentido == "desc" else valores
+            claves.append(np.where(np.isnan(valores), np.inf, valores))
+        # lexsort usa la última clave como principal; el orden estable respeta el de carga
+        return docs[np.lexsort([docs] + claves[::-1])]
+
+    def _valor_orden(self, campo, doc, puntajes):
+        if campo == "_score":
+            return float(puntajes[doc])
+        if campo in self.keyword:
+            codigo = self.keyword[campo].codigos[doc]
+            return self.keyword[campo].vocabulario[codigo] if codigo >= 0 else None
+        valor = self.numerico[campo][doc]
+        if np.isnan(valor):
+            return None
+        return int(valor) if campo in self.fechas or valor.is_integer() else float(valor)
+
+    def _hit(self, doc, puntajes, orden, cuerpo, terminos):
+        documento = self.documentos[doc]
+        por_puntaje = not orden or any(campo == "_score" for campo, _ in orden)
+        hit = {
+            "_index": self.indice,
+            "_id": str(documento.get("id", doc)),
+            "_score": float(puntajes[doc]) if por_puntaje else None,
+            "_source": self._proyectar(documento, cuerpo.get("_source", True))
+        }
+        if orden:
+            hit["sort"] = [self._valor_orden(campo, doc, puntajes) for campo, _ in orden]
+        if cuerpo.get("highlight"):
+            resaltado = self._resaltar(documento, cuerpo["highlight"], terminos)
+            if resaltado:
+                hit["highlight"] = resaltado
+        return hit
+
+    @staticmethod
+    def _proyectar(documento, fuente):
+        if fuente is True:
+            return dict(documento)
+        if fuente is False:
+            return {}
+        incluir = fuente if isinstance(fuente, list) else fuente.get("includes", [])
+        return {campo: documento[campo] for campo in incluir if campo in documento}
+
+    def _resaltar(self, documento, highlight, terminos):
+        """Envuelve en <em> los términos de la consulta que aparecen en cada campo"""
+        resaltado = {}
+        inicio_tag = highlight.get("pre_tags", ["<em>"])[0]
+        fin_tag = highlight.get("post_tags", ["</em>"])[0]
+        for campo in highlight.get("fields", {}):
+            texto = documento.get(campo)
+            buscados = terminos.get(campo)
+            if not texto or not buscados:
+                continue
+            partes = []
+            ultimo = 0
+            for inicio, fin, termino in _tokens_originales(texto):
+                if termino in buscados:
+                    partes.append(texto[ultimo:inicio] + inicio_tag + texto[inicio:fin] + fin_tag)
+                    ultimo = fin
+            if partes:
+                resaltado[campo] = ["".join(partes) + texto[ultimo:]]
+        return resaltado
+
+    # --- Agregaciones ---
+
+    def _agregar(self, aggs, coincide):
+        return {nombre: self._agregacion(definicion, coincide) for nombre, definicion in aggs.items()}
+
+    def _agregacion(self, definicion, coincide):
+        subaggs = definicion.get("aggs") or definicion.get("aggregations")
+        tipo = next(t for t in definicion if t not in ("aggs", "aggregations", "meta"))
+        parametros = definicion[tipo]
+
+        if tipo == "terms":
+            return self._terms(parametros, coincide, subaggs)
+        if tipo == "range":
+            return self._range(parametros, coincide, subaggs)
+        if tipo in ("stats", "avg", "min", "max", "sum", "value_count"):
+            estadisticas = self._stats(parametros["field"], coincide)
+            if tipo == "stats":
+                return estadisticas
+            return {"value": estadisticas["count" if tipo == "value_count" else tipo]}
+        raise ValueError(f"Agregación no soportada por el motor local: {tipo}")
+
+    def _terms(self, parametros, coincide, subaggs):
+        campo = parametros["field"]
+        tamano = parametros.get("size", TERMS_TAM_POR_DEFECTO)
+        if campo in self.keyword:
+            columna = self.keyword[campo]
+            codigos = columna.codigos[coincide]
+            conteos = np.bincount(codigos[codigos >= 0], minlength=len(columna.vocabulario))
+            claves = list(columna.vocabulario)
+            mascaras = lambda i: coincide & (columna.codigos == i)
+        elif campo in self.numerico:
+            valores = self.numerico[campo][coincide]
+            unicos, conteos = np.unique(valores[~np.isnan(valores)], return_counts=True)
+            claves = [int(v) if v.is_integer() else float(v) for v in unicos]
+            mascaras = lambda i: coincide & (self.numerico[campo] == unicos[i])
+        else:
+            raise ValueError(f"El motor local no puede agregar terms sobre el campo: {campo}")
+
+        # Orden de ElasticSearch: mayor conteo primero y, a igual conteo, clave ascendente
+        candidatos = [i for i in np.lexsort((np.arange(len(conteos)), -conteos)) if conteos[i] > 0]
+        buckets = []
+        for i in candidatos[:tamano]:
+            bucket = {"key": claves[i], "doc_count": int(conteos[i])}
+            if subaggs:
+                bucket.update(self._agregar(subaggs, mascaras(i)))
+            buckets.append(bucket)
+        return {
+            "doc_count_error_upper_bound": 0,
+            "sum_other_doc_count": int(sum(conteos[i] for i in candidatos[tamano:])),
+            "buckets": buckets
+        }
+
+    def _range(self, parametros, coincide, subaggs):
+        columna = self.numerico[parametros["field"]]
+        buckets = []
+        for rango in parametros["ranges"]:
+            desde, hasta = rango.get("from"), rango.get("to")
+            mascara = coincide & ~np.isnan(columna)
+            if desde is not None:
+                mascara &= columna >= desde
+            if hasta is not None:
+                mascara &= columna < hasta
+            bucket = {
+                "key": rango.get("key", f"{'*' if desde is None else float(desde)}-"
+                                        f"{'*' if hasta is None else float(hasta)}"),
+                "doc_count": int(mascara.sum())
+            }
+            if desde is not None:
+                bucket["from"] = float(desde)
+            if hasta is not None:
+                bucket["to"] = float(hasta)
+            if subaggs:
+                bucket.update(self._agregar(subaggs, mascara))
+            buckets.append(bucket)
+        return {"buckets": buckets}
+
+    def _stats(self, campo, coincide):
+        valores = self.numerico[campo][coincide]
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return {"count": 0, "min": None, "max": None, "avg": None, "sum": 0.0}
+        return {
+            "count": int(len(valores)),
+            "min": float(valores.min()),
+            "max": float(valores.max()),
+            "avg": float(valores.mean()),
+            "sum": float(valores.sum())
+        }
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Ejecuta una búsqueda con el motor local, sin cluster")
+    parser.add_argument("archivo", help="Archivo de productos JSON, NDJSON o .gz")
+    parser.add_argument("consulta", nargs="?", default='{"query": {"match_all": {}}}',
+                        help="Cuerpo de la búsqueda en JSON, o @archivo.json")
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="Repetir la búsqueda para medir la latencia promedio")
+    args = parser.parse_args()
+
+    try:
+        inicio = time.perf_counter()
+        motor = MotorLocal.desde_archivo(args.archivo)
+        print(f"📂 {motor.cantidad} productos indexados en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo '{args.archivo}'")
+        return
+
+    if args.consulta.startswith("@"):
+        with open(args.consulta[1:], 'r', encoding='utf-8') as archivo:
+            cuerpo = json.load(archivo)
+    else:
+        cuerpo = json.loads(args.consulta)
+
+    inicio = time.perf_counter()
+    for _ in range(args.repeticiones):
+        response = motor.search(index=INDEX_NAME, body=cuerpo)
+    promedio = (time.perf_counter() - inicio) / args.repeticiones * 1000
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    print(f"⏱️  Latencia promedio: {promedio:.3f} ms")
+
+if __name__ == "__main__":
+    main()
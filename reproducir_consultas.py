@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Reproducción de un log de consultas y medición de percentiles de latencia.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Lee un archivo JSONL con una consulta por línea y la reproduce contra el
+cluster (o el servidor simulado) con concurrencia fija (lazo cerrado) o con
+una tasa de llegada constante (lazo abierto). Reporta p50/p95/p99/máximo de
+latencia, throughput y la parte de la latencia que corresponde al servidor
+('took') frente a la sobrecarga del cliente y la red. En lazo abierto el
+tiempo que una llegada espera por un hilo libre se informa aparte como cola
+del cliente.
+
+Cada línea puede ser el cuerpo de la búsqueda o un objeto con las claves
+"body" y, opcionalmente, "index" y "timestamp" (segundos o ISO 8601).
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from elasticsearch import Elasticsearch
+
+from cargar_datos import ES_HOST, ES_PORT, INDEX_NAME
+from servidor_simulado import ServidorSimulado
+
+CONCURRENCIA_POR_DEFECTO = 4
+MAX_EN_VUELO_POR_DEFECTO = 1000
+
+def _segundos(timestamp):
+    """Convierte un timestamp numérico o ISO 8601 a segundos"""
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).timestamp()
+
+def leer_log(ruta, indice=INDEX_NAME):
+    """Lee el log de consultas y devuelve una lista de (indice, cuerpo, timestamp)"""
+    consultas = []
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            registro = json.loads(linea)
+            if "body" in registro:
+                consultas.append((registro.get("index", indice), registro["body"],
+                                  _segundos(registro.get("timestamp"))))
+            else:
+                consultas.append((indice, registro, None))
+    return consultas
+
+def percentil(ordenados, p):
+    """Percentil p (0-100) por rango más cercano de una lista ya ordenada"""
+    if not ordenados:
+        return 0.0
+    rango = math.ceil(p / 100 * len(ordenados))
+    return ordenados[max(0, min(len(ordenados), rango) - 1)]
+
+class Medicion:
+    """Acumula las latencias y errores de la reproducción"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = []
+        self.servidor = []
+        self.sobrecarga = []
+        self.cola = []
+        self.encoladas = 0
+        self.errores = 0
+        self.ejemplos_error = []
+
+    def registrar(self, latencia, took, cola=0.0):
+        with self._lock:
+            self.latencias.append(latencia)
+            self.cola.append(cola)
+            if took is not None:
+                self.servidor.append(took)
+                self.sobrecarga.append(max(0.0, latencia - cola - took))
+
+    def registrar_encolada(self):
+        with self._lock:
+            self.encoladas += 1
+
+    def registrar_error(self, error):
+        with self._lock:
+            self.errores += 1
+            if len(self.ejemplos_error) < 5:
+                self.ejemplos_error.append(str(error))
+
+def _ejecutar(es, medicion, indice, cuerpo, programada):
+    """Ejecuta una consulta y registra su latencia desde el momento programado"""
+    comienzo = time.perf_counter()
+    try:
+        response = es.search(index=indice, body=cuerpo)
+        fin = time.perf_counter()
+        took = response.get("took")
+        medicion.registrar((fin - programada) * 1000, took, max(0.0, comienzo - programada) * 1000)
+    except Exception as e:
+        medicion.registrar_error(e)
+
+def reproducir(es, consultas, concurrencia=CONCURRENCIA_POR_DEFECTO, tasa=None,
+               respetar_tiempos=False, velocidad=1.0, repeticiones=1,
+               max_en_vuelo=MAX_EN_VUELO_POR_DEFECTO):
+    """Reproduce las consultas y devuelve la medición y la duración total
+
+    Sin ``tasa`` cada uno de los ``concurrencia`` workers lanza la siguiente
+    consulta en cuanto termina la anterior (lazo cerrado). Con ``tasa``
+    (consultas/s) o ``respetar_tiempos`` las consultas se lanzan en su momento
+    programado sin esperar a las anteriores (lazo abierto), con hasta
+    ``max_en_vuelo`` consultas en curso, y la latencia se mide desde ese
+    momento para no ocultar las colas. Las llegadas que encuentran
+    ``max_en_vuelo`` consultas en curso se cuentan como encoladas y su
+    espera se separa de la sobrecarga del cliente y la red.
+    """
+    medicion = Medicion()
+    tiempos = [c[2] for c in consultas if c[2] is not None]
+    # Cada repetición del log empieza un segundo después de terminar la anterior
+    periodo = max(tiempos) - min(tiempos) + 1 if tiempos else 0
+    secuencia = [
+        (indice, cuerpo, timestamp + vuelta * periodo if timestamp is not None else None)
+        for vuelta in range(repeticiones)
+        for indice, cuerpo, timestamp in consultas
+    ]
+    inicio = time.perf_counter()
+
+    if tasa is None and not respetar_tiempos:
+        siguiente = iter(secuencia)
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    consulta = next(siguiente, None)
+                if consulta is None:
+                    return
+                _ejecutar(es, medicion, consulta[0], consulta[1], time.perf_counter())
+
+        hilos = [threading.Thread(target=worker, daemon=True) for _ in range(concurrencia)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    else:
+        origen = next((c[2] for c in secuencia if c[2] is not None), None)
+        ultimo = origen
+        en_vuelo = threading.Semaphore(max_en_vuelo)
+
+        def lanzar(indice, cuerpo, programada):
+            try:
+                _ejecutar(es, medicion, indice, cuerpo, programada)
+            finally:
+                en_vuelo.release()
+
+        # El pool crea hilos a demanda, así que un máximo alto no cuesta nada a baja tasa
+        with ThreadPoolExecutor(max_workers=max_en_vuelo) as ejecutor:
+            for i, (indice, cuerpo, timestamp) in enumerate(secuencia):
+                if respetar_tiempos and origen is not None:
+                    # Las líneas sin timestamp se lanzan junto con la anterior
+                    ultimo = timestamp if timestamp is not None else ultimo
+                    desplazamiento = (ultimo - origen) / velocidad
+                else:
+                    desplazamiento = i / tasa if tasa else 0.0
+                programada = inicio + desplazamiento
+                espera = programada - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                if not en_vuelo.acquire(blocking=False):
+                    medicion.registrar_encolada()
+                    en_vuelo.acquire()
+                ejecutor.submit(lanzar, indice, cuerpo, programada)
+
+    return medicion, time.perf_counter() - inicio
+
+def mostrar_resultados(medicion, duracion):
+    """Muestra percentiles de latencia, throughput y desglose servidor/cliente"""
+    latencias = sorted(medicion.latencias)
+    servidor = sorted(medicion.servidor)
+    sobrecarga = sorted(medicion.sobrecarga)
+    completadas = len(latencias)
+
+    print(f"\n⏱️  RESULTADOS DE LA REPRODUCCIÓN:")
+    print(f"   • Consultas completadas: {completadas}")
+    print(f"   • Errores: {medicion.errores}")
+    if medicion.encoladas:
+        print(f"   • Encoladas por falta de hilos libres: {medicion.encoladas} (subir --max-en-vuelo)")
+    print(f"   • Duración: {duracion:.2f} s")
+    print(f"   • Throughput: {completadas / duracion if duracion else 0:.1f} consultas/s")
+    print(f"   {'':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}  (ms)")
+    cola = sorted(medicion.cola) if medicion.encoladas else []
+    for nombre, valores in (("Latencia total", latencias),
+                            ("Servidor (took)", servidor),
+                            ("Cola del cliente", cola),
+                            ("Cliente + red", sobrecarga)):
+        if valores:
+            print(f"   {nombre:<22}{percentil(valores, 50):>9.1f}{percentil(valores, 95):>9.1f}"
+                  f"{percentil(valores, 99):>9.1f}{valores[-1]:>9.1f}")
+    for error in medicion.ejemplos_error:
+        print(f"   ⚠️  {error}")
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Reproduce un log de consultas y mide latencias")
+    parser.add_argument("log", help="Archivo JSONL con una consulta por línea")
+    parser.add_argument("--url", default=f"http://{ES_HOST}:{ES_PORT}",
+                        help=f"Cluster destino (por defecto: http://{ES_HOST}:{ES_PORT})")
+    parser.add_argument("--indice", default=INDEX_NAME,
+                        help=f"Índice para las líneas que no indican uno (por defecto: {INDEX_NAME})")
+    parser.add_argument("--concurrencia", type=int, default=CONCURRENCIA_POR_DEFECTO,
+                        help=f"Consultas simultáneas en lazo cerrado (por defecto: {CONCURRENCIA_POR_DEFECTO})")
+    parser.add_argument("--max-en-vuelo", type=int, default=MAX_EN_VUELO_POR_DEFECTO,
+                        help=f"Máximo de consultas en curso en lazo abierto (por defecto: {MAX_EN_VUELO_POR_DEFECTO})")
+    parser.add_argument("--tasa", type=float,
+                        help="Tasa de llegada en consultas/s (lazo abierto)")
+    parser.add_argument("--respetar-tiempos", action="store_true",
+                        help="Lanzar las consultas según su timestamp original")
+    parser.add_argument("--velocidad", type=float, default=1.0,
+                        help="Factor de aceleración al respetar tiempos (por defecto: 1.0)")
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="Veces que se reproduce el log completo (por defecto: 1)")
+    parser.add_argument("--simulado", action="store_true",
+                        help="Usar un servidor simulado local en lugar de --url")
+    parser.add_argument("--latencia-simulada-ms", type=float, default=2.0,
+                        help="Latencia del servidor simulado en ms (por defecto: 2)")
+    args = parser.parse_args()
+
+    try:
+        consultas = leer_log(args.log, args.indice)
+    except FileNotFoundError:
+        print(f"❌ Error: No se encontró el archivo '{args.log}'")
+        return
+    print(f"📂 {len(consultas)} consultas leídas de '{args.log}'")
+
+    servidor = None
+    url = args.url
+    if args.simulado:
+        servidor = ServidorSimulado(latencia_ms=args.latencia_simulada_ms)
+        url = servidor.iniciar()
+        print(f"🧪 Servidor simulado en {url}")
+
+    # Una conexión por consulta en curso para no serializar las consultas en el cliente
+    lazo_abierto = args.tasa is not None or args.respetar_tiempos
+    en_curso = args.max_en_vuelo if lazo_abierto else args.concurrencia
+    es = Elasticsearch(url, connections_per_node=max(10, en_curso))
+    try:
+        medicion, duracion = reproducir(
+            es, consultas,
+            concurrencia=args.concurrencia,
+            tasa=args.tasa,
+            respetar_tiempos=args.respetar_tiempos,
+            velocidad=args.velocidad,
+            repeticiones=args.repeticiones,
+            max_en_vuelo=args.max_en_vuelo
+        )
+        mostrar_resultados(medicion, duracion)
+    finally:
+        if servidor:
+            servidor.detener()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local que imita las APIs de ElasticSearch usadas por el proyecto.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Responde a _bulk, _doc, _refresh, _search, _msearch y _stats con respuestas
+válidas pero sin indexar nada, de modo que los benchmarks miden solo el costo
+del lado del cliente sin necesidad de un cluster real. Cuenta peticiones,
+bytes y documentos recibidos, disponibles en GET /_simulado/estadisticas, y
+por índice los contadores de escrituras, eliminaciones y refresh que informa
+_stats.
+"""
+
+import argparse
+import gzip
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+PUERTO_SIMULADO = 9250
+VERSION_SIMULADA = "8.11.0"
+
+class _Estadisticas:
+    """Contadores compartidos por todos los hilos del servidor"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.peticiones = 0
+            self.bytes_recibidos = 0
+            self.bytes_enviados = 0
+            self.documentos = 0
+            self.busquedas = 0
+
+    def sumar(self, **valores):
+        with self._lock:
+            for nombre, valor in valores.items():
+                setattr(self, nombre, getattr(self, nombre) + valor)
+
+    def como_dict(self):
+        with self._lock:
+            return {
+                "peticiones": self.peticiones,
+                "bytes_recibidos": self.bytes_recibidos,
+                "bytes_enviados": self.bytes_enviados,
+                "documentos": self.documentos,
+                "busquedas": self.busquedas
+            }
+
+class _Indices:
+    """Contadores por índice que se informan en _stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indices = {}
+
+    def _indice(self, nombre):
+        if nombre not in self._indices:
+            self._indices[nombre] = {"uuid": uuid.uuid4().hex, "index_total": 0, "delete_total": 0,
+                                     "refresh_total": 0, "bytes": 0}
+        return self._indices[nombre]
+
+    def crear(self, nombre):
+        with self._lock:
+            self._indices.pop(nombre, None)
+            self._indice(nombre)
+
+    def eliminar(self, nombre):
+        with self._lock:
+            self._indices.pop(nombre, None)
+
+    def sumar(self, nombre, **valores):
+        with self._lock:
+            indice = self._indice(nombre)
+            for contador, valor in valores.items():
+                indice[contador] += valor
+
+    def refrescar(self, nombres):
+        with self._lock:
+            for nombre in nombres or list(self._indices):
+                self._indice(nombre)["refresh_total"] += 1
+
+    def stats(self, nombres):
+        """Respuesta de _stats con docs, store, indexing, refresh y segments"""
+        with self._lock:
+            seleccion = {n: self._indice(n) for n in nombres} if nombres else dict(self._indices)
+            indices = {}
+            for nombre, c in seleccion.items():
+                documentos = max(0, c["index_total"] - c["delete_total"])
+                metricas = {
+                    "docs": {"count": documentos, "deleted": 0},
+                    "store": {"size_in_bytes": c["bytes"]},
+                    "indexing": {"index_total": c["index_total"], "delete_total": c["delete_total"]},
+                    "refresh": {"total": c["refresh_total"]},
+                    "segments": {"count": 1 if documentos else 0}
+                }
+                indices[nombre] = {"uuid": c["uuid"], "health": "green", "status": "open",
+                                   "primaries": metricas, "total": metricas}
+
+        total = {
+            "docs": {"count": sum(i["primaries"]["docs"]["count"] for i in indices.values()), "deleted": 0},
+            "store": {"size_in_bytes": sum(i["primaries"]["store"]["size_in_bytes"] for i in indices.values())},
+            "indexing": {clave: sum(i["primaries"]["indexing"][clave] for i in indices.values())
+                         for clave in ("index_total", "delete_total")},
+            "refresh": {"total": sum(i["primaries"]["refresh"]["total"] for i in indices.values())},
+            "segments": {"count": sum(i["primaries"]["segments"]["count"] for i in indices.values())}
+        }
+        return {
+            "_shards": {"total": len(indices), "successful": len(indices), "failed": 0},
+            "_all": {"primaries": total, "total": total},
+            "indices": indices
+        }
+
+class _Manejador(BaseHTTPRequestHandler):
+    """Atiende las peticiones imitando las respuestas de ElasticSearch"""
+
+    protocol_version = "HTTP/1.1"
+    # Sin Nagle: cabeceras y cuerpo salen en escrituras separadas
+    disable_nagle_algorithm = True
+    server_version = "ServidorSimulado/1.0"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _leer_cuerpo(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        cuerpo = self.rfile.read(largo) if largo else b""
+        self.server.estadisticas.sumar(peticiones=1, bytes_recibidos=len(cuerpo))
+        if self.headers.get("Content-Encoding") == "gzip":
+            cuerpo = gzip.decompress(cuerpo)
+        return cuerpo
+
+    def _responder(self, cuerpo, status=200):
+        datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+        self.send_response(status)
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(datos)
+        self.server.estadisticas.sumar(bytes_enviados=len(datos))
+
+    def _took(self):
+        """Simula el tiempo de servidor configurado y devuelve el 'took' en ms"""
+        if self.server.latencia:
+            time.sleep(self.server.latencia)
+        return int(self.server.latencia * 1000)
+
+    def _respuesta_busqueda(self, took=None):
+        return {
+            "took": self._took() if took is None else took,
+            "timed_out": False,
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {"total": {"value": 0, "relation": "eq"}, "max_score": None, "hits": []}
+        }
+
+    def _bulk(self, cuerpo, indice_por_defecto=None):
+        items = []
+        lineas = iter(linea for linea in cuerpo.split(b"\n") if linea.strip())
+        for linea in lineas:
+            accion, meta = next(iter(json.loads(linea).items()))
+            indice = meta.get("_index") or indice_por_defecto
+            if accion == "delete":
+                self.server.indices.sumar(indice, delete_total=1)
+            else:
+                documento = next(lineas, b"")
+                self.server.indices.sumar(indice, index_total=1, bytes=len(documento))
+            status = 200 if accion == "delete" else 201
+            items.append({accion: {
+                "_index": meta.get("_index"), "_id": meta.get("_id"),
+                "result": "deleted" if accion == "delete" else "created",
+                "status": status, "_seq_no": 0, "_primary_term": 1
+            }})
+        self.server.estadisticas.sumar(documentos=len(items))
+        return {"took": self._took(), "errors": False, "items": items}
+
+    def _atender(self):
+        ruta = urlsplit(self.path).path
+        partes = [p for p in ruta.split("/") if p]
+        cuerpo = self._leer_cuerpo()
+
+        if partes[:1] == ["_simulado"]:
+            if partes[1:] == ["reiniciar"]:
+                self.server.estadisticas.reiniciar()
+            return self._responder(self.server.estadisticas.como_dict())
+
+        if not partes:
+            return self._responder({
+                "name": "simulado", "cluster_name": "simulado",
+                "version": {"number": VERSION_SIMULADA}, "tagline": "You Know, for Search"
+            })
+
+        if "_alias" in partes and self.command in ("GET", "HEAD"):
+            # El servidor simulado no mantiene alias
+            return self._responder({"error": "alias no encontrado", "status": 404}, 404)
+
+        endpoint = partes[-1] if partes[-1].startswith("_") else None
+        if endpoint is None and len(partes) >= 2 and partes[-2] in ("_doc", "_create", "_update"):
+            endpoint = partes[-2]
+
+        nombres = [] if partes[0].startswith("_") else partes[0].split(",")
+        if "_stats" in partes:
+            return self._responder(self.server.indices.stats(nombres))
+        if endpoint == "_bulk":
+            return self._responder(self._bulk(cuerpo, nombres[0] if nombres else None))
+        if endpoint in ("_doc", "_create", "_update"):
+            self.server.estadisticas.sumar(documentos=1)
+            if self.command == "DELETE":
+                self.server.indices.sumar(partes[0], delete_total=1)
+            else:
+                self.server.indices.sumar(partes[0], index_total=1, bytes=len(cuerpo))
+            return self._responder({
+                "_index": partes[0], "_id": partes[-1] if partes[-1] != endpoint else "1",
+                "result": "deleted" if self.command == "DELETE" else "created",
+                "_seq_no": 0, "_primary_term": 1,
+                "_shards": {"total": 1, "successful": 1, "failed": 0}
+            }, 201 if self.command != "DELETE" else 200)
+        if endpoint == "_search":
+            self.server.estadisticas.sumar(busquedas=1)
+            return self._responder(self._respuesta_busqueda())
+        if endpoint == "_msearch":
+            consultas = [l for l in cuerpo.split(b"\n") if l.strip()][1::2]
+            self.server.estadisticas.sumar(busquedas=len(consultas))
+            # Las búsquedas de un _msearch se atienden en paralelo: una sola espera por petición
+            took = self._took()
+            respuestas = [dict(self._respuesta_busqueda(took), status=200) for _ in consultas]
+            return self._responder({"took": took, "responses": respuestas})
+        if endpoint == "_count":
+            return self._responder({"count": 0, "_shards": {"total": 1, "successful": 1, "failed": 0}})
+        if endpoint in ("_refresh", "_forcemerge", "_flush"):
+            if endpoint == "_refresh":
+                self.server.indices.refrescar(nombres)
+            return self._responder({"_shards": {"total": 1, "successful": 1, "failed": 0}})
+        if endpoint in ("_settings", "_aliases", "_alias"):
+            return self._responder({"acknowledged": True})
+        if endpoint is None and len(partes) == 1:
+            # Crear, eliminar o comprobar la existencia de un índice
+            if self.command == "PUT":
+                self.server.indices.crear(partes[0])
+            elif self.command == "DELETE":
+                self.server.indices.eliminar(partes[0])
+            return self._responder({"acknowledged": True, "index": partes[0]})
+
+        return self._responder({"error": f"endpoint no simulado: {ruta}", "status": 400}, 400)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _atender
+
+class ServidorSimulado:
+    """Servidor simulado que se ejecuta en un hilo en segundo plano"""
+
+    def __init__(self, host="127.0.0.1", puerto=0, latencia_ms=0):
+        self._servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+        self._servidor.daemon_threads = True
+        self._servidor.estadisticas = _Estadisticas()
+        self._servidor.indices = _Indices()
+        self._servidor.latencia = latencia_ms / 1000
+        self._hilo = None
+
+    @property
+    def url(self):
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    @property
+    def estadisticas(self):
+        return self._servidor.estadisticas.como_dict()
+
+    def iniciar(self):
+        """Arranca el servidor en segundo plano y devuelve su URL"""
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        return self.url
+
+    def ejecutar(self):
+        """Atiende peticiones en el hilo actual hasta recibir Ctrl+C"""
+        try:
+            self._servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._servidor.server_close()
+
+    def detener(self):
+        """Detiene el servidor y libera el puerto"""
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.detener()
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de ElasticSearch")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha (por defecto: 127.0.0.1)")
+    parser.add_argument("--puerto", type=int, default=PUERTO_SIMULADO,
+                        help=f"Puerto de escucha (por defecto: {PUERTO_SIMULADO})")
+    parser.add_argument("--latencia-ms", type=float, default=0,
+                        help="Latencia simulada del servidor por petición, en ms (por defecto: 0)")
+    args = parser.parse_args()
+
+    servidor = ServidorSimulado(args.host, args.puerto, args.latencia_ms)
+    print(f"🧪 Servidor simulado escuchando en {servidor.url}", flush=True)
+    servidor.ejecutar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Sincronización incremental (delta) del catálogo de productos.
+Proyecto: ElasticSearch Grupo 1 - Bases de Datos NoSQL
+
+Cada producto se identifica por una huella (hash de su contenido). Un archivo
+de estado local guarda la huella enviada por cada id, de modo que en cada
+ejecución solo se envían los productos nuevos o modificados y se eliminan los
+que ya no están en el catálogo.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+# Archivo de estado por defecto (id -> huella, comprimido con gzip)
+ARCHIVO_ESTADO = ".estado_sincronizacion.json.gz"
+
+# Huella usada para ids cuya eliminación falló y debe reintentarse
+HUELLA_PENDIENTE = ""
+
+def huella(producto):
+    """Calcula la huella del contenido de un producto (64 bits en hexadecimal)"""
+    contenido = json.dumps(producto, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(contenido.encode('utf-8'), digest_size=8).hexdigest()
+
+def cargar_estado(ruta=ARCHIVO_ESTADO):
+    """Lee el archivo de estado; devuelve un estado vacío si no existe"""
+    if not os.path.exists(ruta):
+        return {"indice_uuid": None, "huellas": {}}
+    with gzip.open(ruta, 'rt', encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+def guardar_estado(estado, ruta=ARCHIVO_ESTADO):
+    """Escribe el archivo de estado de forma atómica"""
+    temporal = f"{ruta}.tmp"
+    with gzip.open(temporal, 'wt', encoding='utf-8') as archivo:
+        json.dump(estado, archivo, separators=(',', ':'))
+    os.replace(temporal, ruta)
+
+def generar_acciones_delta(productos, huellas_previas, huellas_nuevas, indice, contadores):
+    """Genera solo las acciones bulk necesarias para llevar el índice al catálogo actual
+
+    Emite un 'index' (upsert del documento completo) por cada producto nuevo o
+    modificado y, al agotar el catálogo, un 'delete' por cada id que ya no
+    aparece. ``huellas_previas`` se vacía a medida que se recorre el catálogo y
+    ``huellas_nuevas`` queda con el estado resultante.
+    """
+    for producto in productos:
+        clave = str(producto['id'])
+        nueva = huella(producto)
+        anterior = huellas_previas.pop(clave, None)
+        huellas_nuevas[clave] = nueva
+
+        if anterior == nueva:
+            contadores["sin_cambios"] += 1
+            continue
+
+        contadores["nuevos" if anterior is None else "modificados"] += 1
+        yield {
+            "_op_type": "index",
+            "_index": indice,
+            "_id": producto['id'],
+            "_source": producto
+        }
+
+    # Lo que quedó en el estado previo ya no existe en el catálogo
+    for clave in list(huellas_previas):
+        del huellas_previas[clave]
+        contadores["eliminados"] += 1
+        yield {
+            "_op_type": "delete",
+            "_index": indice,
+            "_id": clave
+        }